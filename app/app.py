@@ -4,19 +4,24 @@ from __future__ import annotations
 
 import logging
 import tkinter as tk
+from contextlib import contextmanager
+from functools import partial
 from tkinter import filedialog, messagebox
 from typing import TYPE_CHECKING
 
-from app.constants import CANVAS_HEIGHT, CANVAS_WIDTH
+from app.component import COMPONENT_TAG, Component
+from app.constants import CANVAS_HEIGHT, CANVAS_WIDTH, FRAME_INTERVAL_MS
 from app.logging_setup import setup_logging
 from app.menus.arrange_menu import ArrangeMenu
 from app.menus.component_menu import ComponentMenu
 from app.menus.file_menu import FileMenu
 from app.menus.group_menu import GroupMenu
 from app.menus.view_menu import ViewMenu
+from app.selection import Selection
+from app.spatial_index import SpatialIndex
 
 if TYPE_CHECKING:
-    from component import Component
+    from collections.abc import Callable, Iterator
 
 logger = logging.getLogger(__name__)
 
@@ -32,16 +37,24 @@ class App:
         The default width for newly created components.
     comp_height : int
         The default height for newly created components.
-    selection : list[Component]
-        The list of selected components.
+    selection : Selection
+        The selected components, in selection order.
     groups : dict[str, list[Component]]
         The dictionary of groups and their components.
     colors : dict[str, str]
         The dictionary of groups and their colors.
     color_boxes : dict[str, tk.PhotoImage]
         The dictionary of color box images.
+    spatial_index : SpatialIndex
+        The grid index of component positions, also the flat collection of all components on the canvas.
     selection_rect : int | None
-        The ID of the selection rectangle on the canvas.
+        The ID of the selection rectangle on the canvas, hidden while no drag-selection is in progress.
+    hover_component : Component | None
+        The component currently under the mouse cursor, if any.
+    pressed_component : Component | None
+        The component the mouse button was pressed on, until it is released.
+    comp_by_id : dict[int, Component]
+        The components on the canvas, keyed by the ID of their canvas item.
     selection_start_x : float | None
         The X coordinate where a drag-selection started.
     selection_start_y : float | None
@@ -61,16 +74,36 @@ class App:
         self.root.title("3D Print Dose Customization")
         self.comp_width = None
         self.comp_height = None
-        self.selection = []
+        self.selection = Selection()
         self.groups = {}
         self.colors = {}
         self.color_boxes = {}
+        self.spatial_index = SpatialIndex()
         self.selection_rect = None
+        self.hover_component = None
+        self.pressed_component = None
+        self.comp_by_id = {}
         self.selection_start_x = None
         self.selection_start_y = None
         self.component_file = None
         self.zoom_factor = 1.0
 
+        # Checked once so mouse event handlers can skip debug logging entirely when it is disabled
+        self._debug = logger.isEnabledFor(logging.DEBUG)
+
+        # Deferred canvas updates, applied at most once per frame by _flush
+        self._dirty = False
+        self._flush_scheduled = False
+        self._batch_depth = 0
+        self._pending_rect_coords = None
+        self._pending_scrollregion = None
+        self._selection_rect_shown = False
+        self._marquee_selected = set()
+
+        # Canvas view offsets, refreshed lazily after the view scrolls
+        self._x_offset = None
+        self._y_offset = None
+
         menubar = tk.Menu(self.root)
         self.root.config(menu=menubar)
         self.file_menu = FileMenu(self, menubar)
@@ -124,57 +157,206 @@ class App:
         self.v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.h_scrollbar = tk.Scrollbar(self.root, orient=tk.HORIZONTAL, command=self.canvas.xview)
         self.h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
-        self.canvas.config(xscrollcommand=self.h_scrollbar.set, yscrollcommand=self.v_scrollbar.set)
-        self.canvas.config(scrollregion=(0, 0, CANVAS_WIDTH, CANVAS_HEIGHT))
+        with self.batch_updates():
+            self.canvas.config(xscrollcommand=self._on_xscroll, yscrollcommand=self._on_yscroll)
+            self._set_scrollregion(CANVAS_WIDTH, CANVAS_HEIGHT)
 
         # Bind events to the canvas
         self.canvas.bind("<Button-1>", self.on_canvas_click)
         self.canvas.bind("<B1-Motion>", self.on_canvas_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_canvas_release)
 
+        # Component events are bound once to the tag shared by all component items, rather than per item. Only
+        # entering and leaving look up the item under the pointer; a press goes to the hovered component, and the
+        # drag and release that follow go to the component that was pressed
+        for sequence, callback in (
+            ("<Enter>", partial(self._dispatch_component_event, Component.on_enter)),
+            ("<Leave>", partial(self._dispatch_component_event, Component.on_leave)),
+            ("<Button-1>", self._on_component_press),
+            ("<B1-Motion>", self._on_component_drag),
+            ("<ButtonRelease-1>", self._on_component_release),
+        ):
+            self.canvas.tag_bind(COMPONENT_TAG, sequence, callback)
+
         # Prevent the canvas from resizing when the window is resized
         self.canvas_frame.pack_propagate(flag=False)
         self.canvas.pack_propagate(flag=False)
 
+    def _dispatch_component_event(self, handler: Callable[[Component, tk.Event], None], event: tk.Event) -> None:
+        """Pass an event on a component item to the handler of the component owning that item.
+
+        Tk keeps the "current" tag on the item under the pointer, which identifies the component entered or left.
+        """
+        items = self.canvas.find_withtag(tk.CURRENT)
+        comp = self.comp_by_id.get(items[0]) if items else None
+        if comp is not None:
+            handler(comp, event)
+
+    def _on_component_press(self, event: tk.Event) -> None:
+        """Pass a click to the hovered component, keeping it as the target of the drag that may follow."""
+        self.pressed_component = self.hover_component
+        if self.pressed_component is not None:
+            self.pressed_component.on_click(event)
+
+    def _on_component_drag(self, event: tk.Event) -> None:
+        """Pass pointer motion to the pressed component, without looking up the item under the pointer."""
+        if self.pressed_component is not None:
+            self.pressed_component.on_drag(event)
+
+    def _on_component_release(self, event: tk.Event) -> None:
+        """Pass the button release to the pressed component, ending the press."""
+        comp, self.pressed_component = self.pressed_component, None
+        if comp is not None:
+            comp.on_release(event)
+
+    @contextmanager
+    def batch_updates(self) -> Iterator[None]:
+        """Defer flushing canvas updates until the outermost batch exits.
+
+        Batches may be nested; pending updates are applied once when the last one closes.
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self._flush()
+
+    def _schedule_redraw(self) -> None:
+        """Mark the canvas dirty and schedule a flush for the next frame.
+
+        Mouse motion can arrive well above the display refresh rate, so updates made in between are coalesced
+        and applied at most once per FRAME_INTERVAL_MS.
+        """
+        self._dirty = True
+        if self._batch_depth or self._flush_scheduled:
+            return
+        self._flush_scheduled = True
+        self.root.after(FRAME_INTERVAL_MS, self._flush)
+
+    def _set_scrollregion(self, width: int, height: int) -> None:
+        """Schedule a change of the canvas scroll region, coalesced with other pending canvas updates.
+
+        Parameters
+        ----------
+        width : int
+            The width of the scroll region.
+        height : int
+            The height of the scroll region.
+
+        """
+        self._pending_scrollregion = (0, 0, width, height)
+        self._schedule_redraw()
+
+    def _flush(self) -> None:
+        """Apply all pending canvas updates."""
+        self._flush_scheduled = False
+        if not self._dirty or self._batch_depth:
+            return
+        self._dirty = False
+        if self._pending_scrollregion is not None:
+            self.canvas.config(scrollregion=self._pending_scrollregion)
+            self._pending_scrollregion = None
+        if self._pending_rect_coords is not None:
+            if self.selection_rect:
+                self.canvas.coords(self.selection_rect, *self._pending_rect_coords)
+                if not self._selection_rect_shown:
+                    self.canvas.itemconfigure(self.selection_rect, state=tk.NORMAL)
+                    self.canvas.tag_raise(self.selection_rect)
+                    self._selection_rect_shown = True
+                self._update_marquee_selection(*self._pending_rect_coords)
+            self._pending_rect_coords = None
+
+    def _on_xscroll(self, first: str, last: str) -> None:
+        """Update the horizontal scrollbar and invalidate the cached horizontal view offset."""
+        self.h_scrollbar.set(first, last)
+        self._x_offset = None
+
+    def _on_yscroll(self, first: str, last: str) -> None:
+        """Update the vertical scrollbar and invalidate the cached vertical view offset."""
+        self.v_scrollbar.set(first, last)
+        self._y_offset = None
+
+    def _event_canvas_coords(self, event: tk.Event) -> tuple[float, float]:
+        """Convert event window coordinates to canvas coordinates.
+
+        The view offsets only change when the canvas scrolls, so they are queried from Tk once per view change
+        instead of calling canvasx/canvasy on every event.
+
+        Parameters
+        ----------
+        event : tk.Event
+            The mouse event.
+
+        Returns
+        -------
+        tuple[float, float]
+            The (x, y) canvas coordinates of the event, at the current zoom level.
+
+        """
+        if self._x_offset is None:
+            self._x_offset = self.canvas.canvasx(0)
+        if self._y_offset is None:
+            self._y_offset = self.canvas.canvasy(0)
+        return event.x + self._x_offset, event.y + self._y_offset
+
     def clear_canvas(self) -> None:
         """Clear all components from the canvas."""
         self.canvas.delete("all")
+        self.spatial_index.clear()
+        self.comp_by_id.clear()
+        self.hover_component = None
+        self.pressed_component = None
+        self.selection_rect = None
+        self._selection_rect_shown = False
+        self._pending_rect_coords = None
 
     def redraw_canvas(self) -> None:
         """Update the canvas and its contents based on current zoom level."""
         new_width = int(CANVAS_WIDTH * self.zoom_factor)
         new_height = int(CANVAS_HEIGHT * self.zoom_factor)
-        self.canvas.config(width=new_width, height=new_height)
-        self.canvas.config(scrollregion=(0, 0, new_width, new_height))
-        for group in self.groups.values():
-            for comp in group:
+        with self.batch_updates():
+            self.canvas.config(width=new_width, height=new_height)
+            self._set_scrollregion(new_width, new_height)
+            for comp in self.spatial_index:
                 comp.redraw_for_zoom()
 
     def on_canvas_click(self, event: tk.Event) -> None:
         """Handle the click event on the canvas."""
-        x = self.canvas.canvasx(event.x) / self.zoom_factor
-        y = self.canvas.canvasy(event.y) / self.zoom_factor
-        logger.debug("Click at (%d, %d)", x, y)
+        x, y = self._event_canvas_coords(event)
+        x /= self.zoom_factor
+        y /= self.zoom_factor
+        if self._debug:
+            logger.debug("Click at (%d, %d)", x, y)
 
-        if not self.canvas.find_withtag("current"):  # nothing was under cursor when clicked
+        if self.hover_component is None:  # nothing was under cursor when clicked
             self.deselect_all()
+            self._marquee_selected = set()
             self.selection_start_x = x
             self.selection_start_y = y
-            if self.selection_rect:
-                self.canvas.delete(self.selection_rect)
-                self.selection_rect = None
+            self._pending_rect_coords = None
+            if self.selection_rect is None:
+                # Created once and then reused for every drag-selection
+                self.selection_rect = self.canvas.create_rectangle(
+                    0,
+                    0,
+                    0,
+                    0,
+                    outline="blue",
+                    dash=(2, 2),
+                    state=tk.HIDDEN,
+                )
         else:
             self.selection_start_x = None
             self.selection_start_y = None
 
     def on_canvas_drag(self, event: tk.Event) -> None:
         """Handle the drag event on the canvas."""
-        if self.selection_start_x is not None and self.selection_start_y is not None:
-            x = self.canvas.canvasx(event.x) / self.zoom_factor
-            y = self.canvas.canvasy(event.y) / self.zoom_factor
-
-            if self.selection_rect:
-                self.canvas.delete(self.selection_rect)
+        if self.selection_start_x is not None and self.selection_start_y is not None and self.selection_rect:
+            x, y = self._event_canvas_coords(event)
+            x /= self.zoom_factor
+            y /= self.zoom_factor
 
             # Scale coordinates for display
             scaled_start_x = self.selection_start_x * self.zoom_factor
@@ -182,49 +364,56 @@ class App:
             scaled_x = x * self.zoom_factor
             scaled_y = y * self.zoom_factor
 
-            self.selection_rect = self.canvas.create_rectangle(
-                scaled_start_x,
-                scaled_start_y,
-                scaled_x,
-                scaled_y,
-                outline="blue",
-                dash=(2, 2),
-            )
+            # Move the existing rectangle once per frame rather than on every motion event
+            self._pending_rect_coords = (scaled_start_x, scaled_start_y, scaled_x, scaled_y)
+            self._schedule_redraw()
 
     def on_canvas_release(self, event: tk.Event) -> None:
         """Handle the release event on the canvas."""
-        x = self.canvas.canvasx(event.x)
-        y = self.canvas.canvasy(event.y)
-        logger.debug("Release at (%d, %d)", x, y)
+        if self._debug:
+            x, y = self._event_canvas_coords(event)
+            logger.debug("Release at (%d, %d)", x, y)
         if self.selection_rect:
-            x1, y1, x2, y2 = self.canvas.coords(self.selection_rect)
-            self.select_components_in_area(x1, y1, x2, y2)
-            self.canvas.delete(self.selection_rect)
-            self.selection_rect = None
-
-    def select_components_in_area(self, x1: int, y1: int, x2: int, y2: int) -> None:
-        """Select all components within the specified area."""
-        # Convert selection coordinates to unscaled coordinates
-        x1 = x1 / self.zoom_factor
-        y1 = y1 / self.zoom_factor
-        x2 = x2 / self.zoom_factor
-        y2 = y2 / self.zoom_factor
-
-        for group in self.groups.values():
-            for comp in group:
-                if (
-                    comp.x >= min(x1, x2)
-                    and comp.x + self.comp_width <= max(x1, x2)
-                    and comp.y >= min(y1, y2)
-                    and comp.y + self.comp_height <= max(y1, y2)
-                ):
-                    comp.select()
-        if self.selection:
-            self.update_label(self.selection[0])
+            self._flush()  # apply the final rectangle and selection before hiding it
+            if self._selection_rect_shown:
+                self.canvas.itemconfigure(self.selection_rect, state=tk.HIDDEN)
+                self._selection_rect_shown = False
+            self._marquee_selected = set()
+
+    def _components_in_area(self, x1: float, y1: float, x2: float, y2: float) -> list[Component]:
+        """Return all components fully within the specified area, given in zoomed canvas coordinates."""
+        if self.comp_width is None or self.comp_height is None:
+            return []
+
+        # Order the corners, then convert to unscaled coordinates
+        lo_x, hi_x = (x1, x2) if x1 <= x2 else (x2, x1)
+        lo_y, hi_y = (y1, y2) if y1 <= y2 else (y2, y1)
+        zoom = self.zoom_factor
+
+        # A component is fully enclosed when its origin lies in the area shrunk by the component size
+        return self.spatial_index.query(
+            lo_x / zoom,
+            lo_y / zoom,
+            hi_x / zoom - self.comp_width,
+            hi_y / zoom - self.comp_height,
+        )
+
+    def _update_marquee_selection(self, x1: float, y1: float, x2: float, y2: float) -> None:
+        """Select components as the drag-selection rectangle grows over them and deselect them as it shrinks.
+
+        Only components entering or leaving the rectangle since the previous update are touched.
+        """
+        inside = set(self._components_in_area(x1, y1, x2, y2))
+        for comp in self._marquee_selected - inside:
+            comp.deselect()
+        for comp in inside - self._marquee_selected:
+            comp.select()
+        self._marquee_selected = inside
+        self.update_label(self.selection[0] if self.selection else None)
 
     def deselect_all(self) -> None:
         """Deselect all components."""
-        for comp in self.selection[:]:  # operate on a copy of the list since it will be modified
+        for comp in list(self.selection):  # operate on a copy since deselecting modifies the selection
             comp.deselect()
         self.update_label(None)
 
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from app.constants import FRAME_INTERVAL_MS
+
 if TYPE_CHECKING:
     import tkinter as tk
 
@@ -11,6 +13,12 @@ if TYPE_CHECKING:
 
 SHIFT_KEY = 0x0001
 
+# Canvas tag shared by every component item
+COMPONENT_TAG = "comp"
+
+# Canvas tag carried by the items of selected components, so the whole selection can be moved with one call
+SELECTED_TAG = "selected"
+
 
 class Component:
     """A class used to represent a Component on the Tkinter Canvas.
@@ -25,16 +33,10 @@ class Component:
         The x-coordinate of the component.
     y : int
         The y-coordinate of the component.
-    width : int
-        The width of the component.
-    height : int
-        The height of the component.
     start_x : int | None
         The starting x-coordinate for dragging.
     start_y : int | None
         The starting y-coordinate for dragging.
-    selected : bool
-        Whether the component is selected.
     group : str
         The group to which the component belongs.
     dragged : bool
@@ -42,6 +44,24 @@ class Component:
 
     """
 
+    # Thousands of components can be on the canvas at once, so instances keep their attributes in fixed slots
+    # rather than a per-instance dict
+    __slots__ = (
+        "_drag_pending",
+        "_drag_scheduled",
+        "_drawn_scale",
+        "_fill",
+        "_outlined",
+        "app",
+        "comp",
+        "dragged",
+        "group",
+        "start_x",
+        "start_y",
+        "x",
+        "y",
+    )
+
     def __init__(
         self,
         app: App,
@@ -71,20 +91,22 @@ class Component:
         self.dragged = False
         self.start_x = None
         self.start_y = None
+        self._drag_pending: tuple[int, int] | None = None
+        self._drag_scheduled = False
+
+        # Last fill color and outline state given to the canvas item, so unchanged values are not sent to Tk again
+        self._fill = "blue"
+        self._outlined = False
+        self._drawn_scale = (self.app.zoom_factor, self.app.comp_width, self.app.comp_height)
         self.comp = self.app.canvas.create_rectangle(
-            self.x,
-            self.y,
-            self.x + self.app.comp_width,
-            self.y + self.app.comp_height,
-            fill="blue",
-            tags="comp",
+            *self._scaled_bbox(),
+            fill=self._fill,
+            tags=COMPONENT_TAG,
             outline="",
             width=0,
         )
-        self.app.canvas.tag_bind(self.comp, "<Button-1>", self.on_click)
-        self.app.canvas.tag_bind(self.comp, "<B1-Motion>", self.on_drag)
-        self.app.canvas.tag_bind(self.comp, "<ButtonRelease-1>", self.on_release)
-        self.redraw_for_zoom()
+        self.app.comp_by_id[self.comp] = self
+        self.app.spatial_index.insert(self)
 
     def on_click(self, event: tk.Event) -> None:
         """Handle the click event on the component.
@@ -113,37 +135,88 @@ class Component:
     def on_drag(self, event: tk.Event) -> None:
         """Handle the drag event on the component.
 
+        Motion events can arrive well above the display refresh rate, so only the latest pointer position is
+        kept and the selection is moved to it at most once per FRAME_INTERVAL_MS.
+
         Parameters
         ----------
         event : tk.Event
             The event object containing information about the drag event.
 
         """
-        if self.start_x is not None and self.start_y is not None:
-            dx = (event.x - self.start_x) / self.app.zoom_factor
-            dy = (event.y - self.start_y) / self.app.zoom_factor
+        if self.start_x is None or self.start_y is None:
+            return
+        self._drag_pending = (event.x, event.y)
+        if not self._drag_scheduled:
+            self._drag_scheduled = True
+            self.app.root.after(FRAME_INTERVAL_MS, self._flush_drag)
+
+    def _flush_drag(self) -> None:
+        """Move the selection to follow the latest pointer position seen while dragging."""
+        self._drag_scheduled = False
+        if self._drag_pending is None or self.start_x is None or self.start_y is None:
+            return
+        x, y = self._drag_pending
+        self._drag_pending = None
+        dx = (x - self.start_x) / self.app.zoom_factor
+        dy = (y - self.start_y) / self.app.zoom_factor
+
+        if dx != 0 or dy != 0:
+            self.dragged = True
+            self._move_selection(int(self.x + dx) - self.x, int(self.y + dy) - self.y)
+
+            self.start_x = x
+            self.start_y = y
+            self.app.update_label(self)
+
+    def _move_selection(self, dx: int, dy: int) -> None:
+        """Move every selected component by the same offset, translating their canvas items with one call.
 
-            if dx != 0 or dy != 0:
-                self.dragged = True
-                for comp in self.app.selection:
-                    comp.set_position(comp.x + dx, comp.y + dy)
+        Parameters
+        ----------
+        dx : int
+            The change in x-coordinate.
+        dy : int
+            The change in y-coordinate.
 
-                self.start_x = event.x
-                self.start_y = event.y
-                self.app.update_label(self)
+        """
+        if dx == 0 and dy == 0:
+            return
+        for comp in self.app.selection:
+            comp.x += dx
+            comp.y += dy
+            self.app.spatial_index.move(comp)
+        zoom = self.app.zoom_factor
+        self.app.canvas.move(SELECTED_TAG, dx * zoom, dy * zoom)
 
     def on_release(self, _: tk.Event) -> None:
-        """Handle the release event on the component."""
+        """Handle the release event on the component, applying any drag motion still pending."""
+        self._flush_drag()
         self.start_x = None
         self.start_y = None
         self.dragged = False
 
+    def on_enter(self, _: tk.Event) -> None:
+        """Track the component as the one under the mouse cursor."""
+        self.app.hover_component = self
+
+    def on_leave(self, _: tk.Event) -> None:
+        """Stop tracking the component as the one under the mouse cursor."""
+        if self.app.hover_component is self:
+            self.app.hover_component = None
+
     def delete(self) -> None:
         """Delete the component from the canvas."""
         self.app.canvas.delete(self.comp)
+        self.app.comp_by_id.pop(self.comp, None)
+        if self.app.hover_component is self:
+            self.app.hover_component = None
+        if self.app.pressed_component is self:
+            self.app.pressed_component = None
+        self.app.spatial_index.remove(self)
 
     def set_color(self, color: str) -> None:
-        """Set the color of the component.
+        """Set the color of the component, if it differs from its current color.
 
         Parameters
         ----------
@@ -151,6 +224,9 @@ class Component:
             The color to set for the component.
 
         """
+        if color == self._fill:
+            return
+        self._fill = color
         self.app.canvas.itemconfig(self.comp, fill=color)
 
     def set_group(self, group: str) -> None:
@@ -168,15 +244,17 @@ class Component:
 
     def select(self) -> None:
         """Select the component."""
-        self.app.canvas.itemconfig(self.comp, outline="red", width=3)
-        if self not in self.app.selection:
-            self.app.selection.append(self)
+        if not self._outlined:
+            self._outlined = True
+            self.app.canvas.itemconfig(self.comp, outline="red", width=3, tags=(COMPONENT_TAG, SELECTED_TAG))
+        self.app.selection.append(self)
 
     def deselect(self) -> None:
         """Deselect the component."""
-        self.app.canvas.itemconfig(self.comp, outline="", width=0)
-        if self in self.app.selection:
-            self.app.selection.remove(self)
+        if self._outlined:
+            self._outlined = False
+            self.app.canvas.itemconfig(self.comp, outline="", width=0, tags=COMPONENT_TAG)
+        self.app.selection.discard(self)
 
     def toggle_selection(self) -> None:
         """Toggle the selection state of the component."""
@@ -188,6 +266,9 @@ class Component:
     def set_position(self, x: int, y: int) -> None:
         """Set the position of the component.
 
+        The canvas item is translated by the change in position rather than given new coordinates, so Tk does
+        not have to replace its geometry. Only a zoom change rescales it, through redraw_for_zoom.
+
         Parameters
         ----------
         x : int
@@ -196,9 +277,15 @@ class Component:
             The new y-coordinate of the component.
 
         """
-        self.x = int(x)
-        self.y = int(y)
-        self.redraw_for_zoom()
+        dx = int(x) - self.x
+        dy = int(y) - self.y
+        if dx == 0 and dy == 0:
+            return
+        self.x += dx
+        self.y += dy
+        self.app.spatial_index.move(self)
+        zoom = self.app.zoom_factor
+        self.app.canvas.move(self.comp, dx * zoom, dy * zoom)
 
     def to_dict(self) -> tuple[int, int]:
         """Convert the component position to a tuple.
@@ -211,11 +298,26 @@ class Component:
         """
         return (self.x, self.y)
 
-    def redraw_for_zoom(self) -> None:
-        """Redraw the component for the current zoom level."""
+    def _scaled_bbox(self) -> tuple[float, float, float, float]:
+        """Return the canvas coordinates of the component at the current zoom level."""
         zoom = self.app.zoom_factor
         scaled_x = self.x * zoom
         scaled_y = self.y * zoom
-        scaled_w = self.app.comp_width * zoom
-        scaled_h = self.app.comp_height * zoom
-        self.app.canvas.coords(self.comp, scaled_x, scaled_y, scaled_x + scaled_w, scaled_y + scaled_h)
+        return (
+            scaled_x,
+            scaled_y,
+            scaled_x + self.app.comp_width * zoom,
+            scaled_y + self.app.comp_height * zoom,
+        )
+
+    def redraw_for_zoom(self) -> None:
+        """Redraw the component for the current zoom level.
+
+        Moves keep the canvas item in place at the zoom it was drawn at, so it only needs new coordinates when the
+        zoom level or the component size has changed since it was last drawn.
+        """
+        scale = (self.app.zoom_factor, self.app.comp_width, self.app.comp_height)
+        if scale == self._drawn_scale:
+            return
+        self._drawn_scale = scale
+        self.app.canvas.coords(self.comp, *self._scaled_bbox())
@@ -1,13 +1,23 @@
 """Cutout tool for selecting one component from a print file."""
 
+import math
 import tkinter as tk
+from collections import OrderedDict
 from tkinter import filedialog, messagebox
 
+import numpy as np
 from PIL import ImageTk
 
 from app.image_ops import export_cropped_slices, find_white_regions, merge_slices
 from app.popup import Popup
 
+# Number of resized previews kept. Previews are keyed by the visible crop as well as the zoom level, so any scroll
+# misses; the cache only spares redraws of the view on screen and a step back to the view before it.
+PREVIEW_CACHE_SIZE = 2
+
+# Delay, in milliseconds, after the last zoom step before the preview is redrawn at the new zoom level
+ZOOM_REDRAW_DELAY_MS = 80
+
 
 class ComponentSelector:
     """A UI for segmenting print files into their components by selcting and cropping slice images."""
@@ -41,12 +51,16 @@ class ComponentSelector:
         self.selected_bbox = None
         self.preview_img = None
         self.preview_canvas_img = None
+        self._resize_cache: OrderedDict[tuple, ImageTk.PhotoImage] = OrderedDict()
+        self._redraw_pending = False
+        self._zoom_redraw_after_id: str | None = None
 
         # Load and process image with popup
         popup = Popup(self.root, message="Processing images...")
         try:
             self.original_img = merge_slices(self.input_zip)
-            self.regions_data = find_white_regions(self.original_img)
+            # Kept as one (N, 4) array of (x_min, y_min, x_max, y_max) rows so clicks are hit-tested in bulk
+            self.regions_data = np.asarray(find_white_regions(self.original_img), dtype=np.int32).reshape(-1, 4)
         finally:
             popup.destroy()
 
@@ -54,6 +68,7 @@ class ComponentSelector:
         screen_width = self.root.winfo_screenwidth() * 0.8
         screen_height = self.root.winfo_screenheight() * 0.8
         self.zoom_factor = min(screen_width / self.original_img.width, screen_height / self.original_img.height)
+        self._drawn_zoom = self.zoom_factor
 
         self._create_widgets()
         self.redraw_image()
@@ -102,27 +117,49 @@ class ComponentSelector:
         self.preview_canvas.pack(anchor="center", expand=True)
 
         # Configure scrollbars
-        self.scroll_x.config(command=self.preview_canvas.xview)
-        self.scroll_y.config(command=self.preview_canvas.yview)
+        self.scroll_x.config(command=self._on_xscroll)
+        self.scroll_y.config(command=self._on_yscroll)
 
-        # Create initial preview image
-        self.preview_img = ImageTk.PhotoImage(self.original_img)
-        self.preview_canvas_img = self.preview_canvas.create_image(0, 0, anchor=tk.NW, image=self.preview_img)
+        # Create the preview image item, which redraw_image fills with the visible part of the image
+        self.preview_canvas_img = self.preview_canvas.create_image(0, 0, anchor=tk.NW)
 
         # Bind events
         self.preview_canvas.bind("<Button-1>", self.on_canvas_click)
+        self.preview_canvas.bind("<Configure>", lambda _: self._schedule_redraw())
+
+    def _on_xscroll(self, *args: str) -> None:
+        """Scroll the canvas horizontally and redraw the newly visible part of the image."""
+        self.preview_canvas.xview(*args)
+        self._schedule_redraw()
+
+    def _on_yscroll(self, *args: str) -> None:
+        """Scroll the canvas vertically and redraw the newly visible part of the image."""
+        self.preview_canvas.yview(*args)
+        self._schedule_redraw()
+
+    def _schedule_redraw(self) -> None:
+        """Redraw the image once the event queue is idle, so a burst of scroll events costs a single redraw."""
+        if self._redraw_pending:
+            return
+        self._redraw_pending = True
+        self.root.after_idle(self._flush_redraw)
+
+    def _flush_redraw(self) -> None:
+        """Redraw the image for the current view."""
+        self._redraw_pending = False
+        self.redraw_image()
 
     def update_selection_box(self) -> None:
-        """Update the red selection box based on current zoom level."""
+        """Update the red selection box based on the zoom level of the image on screen."""
         if self.selected_bbox is None:
             return
         if self.highlight_rect:
             self.preview_canvas.delete(self.highlight_rect)
         x_min, y_min, x_max, y_max = self.selected_bbox
-        scaled_x_min = x_min * self.zoom_factor
-        scaled_y_min = y_min * self.zoom_factor
-        scaled_x_max = x_max * self.zoom_factor
-        scaled_y_max = y_max * self.zoom_factor
+        scaled_x_min = x_min * self._drawn_zoom
+        scaled_y_min = y_min * self._drawn_zoom
+        scaled_x_max = x_max * self._drawn_zoom
+        scaled_y_max = y_max * self._drawn_zoom
         self.highlight_rect = self.preview_canvas.create_rectangle(
             scaled_x_min,
             scaled_y_min,
@@ -133,46 +170,90 @@ class ComponentSelector:
         )
 
     def redraw_image(self) -> None:
-        """Redraw the image at current zoom level."""
-        new_width = int(self.original_img.width * self.zoom_factor)
-        new_height = int(self.original_img.height * self.zoom_factor)
-        resized_img = self.original_img.resize((new_width, new_height))
-        self.preview_img = ImageTk.PhotoImage(resized_img)
-        self.preview_canvas.itemconfig(self.preview_canvas_img, image=self.preview_img)
+        """Redraw the visible part of the image at current zoom level.
+
+        Only the part of the image inside the viewport is cropped and scaled, so the cost of a redraw depends on the
+        window size rather than on the image size and zoom level.
+        """
+        zoom = self.zoom_factor
+        width = self.original_img.width
+        height = self.original_img.height
+        new_width = int(width * zoom)
+        new_height = int(height * zoom)
         self.preview_canvas.config(scrollregion=(0, 0, new_width, new_height))
+
+        # Convert the visible fractions of the scroll region to a box of whole source pixels
+        x_start, x_end = self.preview_canvas.xview()
+        y_start, y_end = self.preview_canvas.yview()
+        box = (
+            int(x_start * width),
+            int(y_start * height),
+            min(width, math.ceil(x_end * width)),
+            min(height, math.ceil(y_end * height)),
+        )
+        size = (
+            max(1, round((box[2] - box[0]) * zoom)),
+            max(1, round((box[3] - box[1]) * zoom)),
+        )
+        key = (box, size)
+
+        # The cache holds the reference that keeps each Tk image alive while it may be displayed
+        if key in self._resize_cache:
+            self._resize_cache.move_to_end(key)
+        else:
+            resized_img = self.original_img.crop(box).resize(size)
+            self._resize_cache[key] = ImageTk.PhotoImage(resized_img)
+            if len(self._resize_cache) > PREVIEW_CACHE_SIZE:
+                self._resize_cache.popitem(last=False)
+        self.preview_img = self._resize_cache[key]
+        self.preview_canvas.itemconfig(self.preview_canvas_img, image=self.preview_img)
+        self.preview_canvas.coords(self.preview_canvas_img, box[0] * zoom, box[1] * zoom)
+        self._drawn_zoom = zoom
         self.update_selection_box()  # Redraw selection box at new zoom level
 
+    def _schedule_zoom_redraw(self) -> None:
+        """Redraw the image once zooming pauses, so a burst of zoom steps only renders the final zoom level."""
+        if self._zoom_redraw_after_id is not None:
+            self.root.after_cancel(self._zoom_redraw_after_id)
+        self._zoom_redraw_after_id = self.root.after(ZOOM_REDRAW_DELAY_MS, self._do_redraw)
+
+    def _do_redraw(self) -> None:
+        """Redraw the image at the zoom level reached by the last zoom step."""
+        self._zoom_redraw_after_id = None
+        self.redraw_image()
+
     def zoom_in(self) -> None:
         """Increase zoom by 10%."""
         self.zoom_factor += 0.1
-        self.redraw_image()
+        self._schedule_zoom_redraw()
 
     def zoom_out(self) -> None:
         """Decrease zoom by 10%."""
         self.zoom_factor = max(0.1, self.zoom_factor - 0.1)
-        self.redraw_image()
+        self._schedule_zoom_redraw()
 
     def show_region_details(self, idx: int) -> None:
         """Update UI to show details of selected region."""
         self.selected_region_index = idx
-        x_min, y_min, x_max, y_max = self.regions_data[idx]
+        x_min, y_min, x_max, y_max = self.regions_data[idx].tolist()
         self.selected_bbox = (x_min, y_min, x_max, y_max)
         self.update_selection_box()
-        self.region_details_label.config(text=f"Selected Region {idx+1} : bbox={self.regions_data[idx]}")
+        self.region_details_label.config(text=f"Selected Region {idx+1} : bbox={self.selected_bbox}")
 
     def on_canvas_click(self, event: tk.Event) -> None:
         """Handle mouse clicks on the canvas."""
         # Convert mouse coords from screen/canvas space to original image coords
         canvas_x = self.preview_canvas.canvasx(event.x)
         canvas_y = self.preview_canvas.canvasy(event.y)
-        img_x = canvas_x / self.zoom_factor
-        img_y = canvas_y / self.zoom_factor
-
-        # find the region that was clicked
-        for idx, (x_min, y_min, x_max, y_max) in enumerate(self.regions_data):
-            if (x_min <= img_x <= x_max) and (y_min <= img_y <= y_max):
-                self.show_region_details(idx)
-                return
+        # Map against the zoom level of the image on screen, which lags zoom_factor until a pending redraw runs
+        img_x = canvas_x / self._drawn_zoom
+        img_y = canvas_y / self._drawn_zoom
+
+        # Find the first region that was clicked, testing all bounding boxes at once
+        bboxes = self.regions_data
+        hits = (bboxes[:, 0] <= img_x) & (img_x <= bboxes[:, 2]) & (bboxes[:, 1] <= img_y) & (img_y <= bboxes[:, 3])
+        if hits.any():
+            self.show_region_details(int(hits.argmax()))
 
     def export_cropped_images(self) -> None:
         """Export the selected region from all slices."""
@@ -3,3 +3,6 @@
 # Set to printable area height and width in pixels
 CANVAS_WIDTH = 2560
 CANVAS_HEIGHT = 1600
+
+# Minimum delay between deferred canvas flushes, about one frame at 60 Hz
+FRAME_INTERVAL_MS = 16
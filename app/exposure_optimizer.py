@@ -1,18 +1,31 @@
 """Optimize print time by combining non-overlapping images with similar settings."""
 
-import copy
 import logging
+import os
+from collections import defaultdict, deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
 from typing import Any
 
-from PIL import Image, ImageChops
+import numpy as np
+from PIL import Image
 
-from app.constants import CANVAS_HEIGHT, CANVAS_WIDTH
-from app.graph_coloring import partition_images
-from app.print_file_utils import load_print_file, save_print_file
+from app.graph_coloring import get_bbox, partition_images
+from app.print_file_utils import LazyImageStore, open_print_file, save_print_file
 
 logger = logging.getLogger(__name__)
 
+# Image settings that may differ between images combined into one exposure
+UNGROUPED_KEYS = frozenset(("Image file", "Layer exposure time (ms)"))
+
+# Minimum number of layers to optimize before the work is spread across worker processes
+PARALLEL_MIN_LAYERS = 8
+
+# Number of layers per worker process handed to the pool ahead of the results being collected, so only a few
+# layers' images are loaded at once
+PARALLEL_QUEUE_DEPTH = 2
+
 
 def group_by_settings(image_settings: list[dict[str, Any]]) -> dict[tuple[tuple[str, Any], ...], list[dict[str, Any]]]:
     """Group images where all image settings are the same except name and exposure time.
@@ -28,36 +41,46 @@ def group_by_settings(image_settings: list[dict[str, Any]]) -> dict[tuple[tuple[
         Dictionary mapping parameter tuples to lists of image settings that share those parameters.
 
     """
+    groups: dict[tuple[tuple[str, Any], ...], list[dict[str, Any]]] = defaultdict(list)
 
-    def get_image_key(settings: dict[str, Any]) -> tuple[tuple[str, Any], ...]:
-        return tuple((k, v) for k, v in sorted(settings.items()) if k not in {"Image file", "Layer exposure time (ms)"})
-
-    groups: dict[tuple[tuple[str, Any], ...], list[dict[str, Any]]] = {}
+    # Settings dicts almost always share the same keys, so sort and filter each distinct key layout only once
+    key_names_by_layout: dict[tuple[str, ...], tuple[str, ...]] = {}
     for settings in image_settings:
-        key = get_image_key(settings)
-        if key not in groups:
-            groups[key] = []
-        groups[key].append(settings)
+        layout = tuple(settings)
+        key_names = key_names_by_layout.get(layout)
+        if key_names is None:
+            key_names = tuple(sorted(k for k in settings if k not in UNGROUPED_KEYS))
+            key_names_by_layout[layout] = key_names
+        groups[tuple((k, settings[k]) for k in key_names)].append(settings)
 
     logger.debug("Grouped %d images into %d distinct setting groups", len(image_settings), len(groups))
-    return groups
+    return dict(groups)
 
 
 def combine_exposures(
     group: list[dict[str, Any]],
-    group_images: list[Image.Image],
+    group_images: list[Image.Image] | list[np.ndarray],
+    bboxes: list[tuple[int, int, int, int] | None] | None = None,
+    scratch: np.ndarray | None = None,
 ) -> tuple[list[dict[str, Any]], dict[str, Image.Image]]:
     """Create optimized exposure settings and composite images by combining exposures.
 
     This helper function creates composite images for each unique exposure time
-    and returns new settings and images.
+    and returns new settings and images. A step whose composite has only one non-empty
+    source image is identical to that image, so its setting refers to the source image
+    file and no new image is returned for it.
 
     Parameters
     ----------
     group : list[dict[str, Any]]
         Group of image settings with the same parameters
-    group_images : list[Image.Image]
-        List of images corresponding to the settings in the group
+    group_images : list[Image.Image] | list[np.ndarray]
+        List of images, or their 2D arrays, corresponding to the settings in the group
+    bboxes : list[tuple[int, int, int, int] | None] | None, optional
+        Bounding box of the non-zero pixels of each image, or None for an empty image. Computed if not given.
+    scratch : np.ndarray | None, optional
+        All-zero uint8 buffer the size of the images, used to build the composites and zeroed again before
+        returning, so one buffer can be shared by every call for a layer. Allocated if not given.
 
     Returns
     -------
@@ -68,12 +91,31 @@ def combine_exposures(
     logger.debug("Combining exposures for group with %d images", len(group))
     new_settings = []
     new_images = {}
-    prev_exposure = 0
+
+    arrays = [np.asarray(img, dtype=np.uint8) for img in group_images]
+    if bboxes is None:
+        bboxes = [get_bbox(arr) for arr in arrays]
+
+    # The composite at index i is the maximum of images i onwards, so walk the group backwards and fold each
+    # image into a running composite instead of recombining the whole tail at every step. Pixels outside an
+    # image's bounding box are zero, so only that box needs folding in. Counting the non-empty images folded in
+    # tells whether the composite is empty, or identical to a single source image, without scanning it.
+    running = np.zeros(arrays[0].shape, dtype=np.uint8) if scratch is None else scratch
+    nonempty_count = 0
+    last_nonempty = 0
 
     # First pass: create composite images for each unique exposure time
     composites = {}
-    for i, settings in enumerate(group):
-        current_exposure = settings["Layer exposure time (ms)"]
+    for i in range(len(group) - 1, -1, -1):
+        if bboxes[i] is not None:
+            x1, y1, x2, y2 = bboxes[i]
+            region = running[y1:y2, x1:x2]
+            np.maximum(region, arrays[i][y1:y2, x1:x2], out=region)
+            nonempty_count += 1
+            last_nonempty = i
+
+        current_exposure = group[i]["Layer exposure time (ms)"]
+        prev_exposure = group[i - 1]["Layer exposure time (ms)"] if i > 0 else 0
         exposure_diff = current_exposure - prev_exposure
 
         if exposure_diff > 0:
@@ -85,29 +127,27 @@ def combine_exposures(
                 exposure_diff,
             )
 
-            # Create composite of all images from this index onwards
-            composite = Image.new("L", (CANVAS_WIDTH, CANVAS_HEIGHT), color=0)
-
-            # Use a copy of each image to avoid modifying the original
-            for j in range(i, len(group_images)):
-                img_copy = group_images[j].copy()
-                composite = ImageChops.lighter(composite, img_copy)
-
-            # Only store composite if it contains non-zero pixels
-            if composite.getbbox() is not None:
-                composites[i] = (composite, exposure_diff)
+            # Only store composite if it contains non-zero pixels, reusing the source image if it is the only one
+            if nonempty_count == 1:
+                composites[i] = (group[last_nonempty]["Image file"], None, exposure_diff)
+                logger.debug("Reusing image %d for index %d with exposure diff %d", last_nonempty, i, exposure_diff)
+            elif nonempty_count > 1:
+                new_img_name = f"{Path(group[i]['Image file']).stem}_opt_{i}.png"
+                composites[i] = (new_img_name, Image.fromarray(running.copy()), exposure_diff)
                 logger.debug("Created composite image for index %d with exposure diff %d", i, exposure_diff)
 
-        prev_exposure = current_exposure
+    # Only the bounding boxes of the images were written to, so zero just their union for the next caller
+    nonempty_bboxes = [bbox for bbox in bboxes if bbox is not None]
+    if scratch is not None and nonempty_bboxes:
+        x1s, y1s, x2s, y2s = zip(*nonempty_bboxes, strict=True)
+        scratch[min(y1s) : max(y2s), min(x1s) : max(x2s)] = 0
 
     # Second pass: create settings for composite images
-    for i, (composite, exposure_diff) in composites.items():
-        settings = copy.deepcopy(group[i])
-        new_img_name = f"{Path(settings['Image file']).stem}_opt_{i}.png"
-        new_setting = {**settings, "Image file": new_img_name, "Layer exposure time (ms)": exposure_diff}
+    for i, (new_img_name, composite, exposure_diff) in sorted(composites.items()):
+        new_setting = {**group[i], "Image file": new_img_name, "Layer exposure time (ms)": exposure_diff}
 
-        # Store a copy of the composite image to avoid any reference issues
-        new_images[new_img_name] = composite.copy()
+        if composite is not None:
+            new_images[new_img_name] = composite
         new_settings.append(new_setting)
         logger.debug("Created optimized setting: %s with exposure %d ms", new_img_name, exposure_diff)
 
@@ -118,6 +158,7 @@ def combine_exposures(
 def optimize_layer(
     image_settings: list[dict[str, Any]],
     images: dict[str, Image.Image],
+    max_workers: int = 1,
 ) -> tuple[list[dict[str, Any]], dict[str, Image.Image]]:
     """Optimize exposure times by combining non-overlapping images.
 
@@ -127,6 +168,9 @@ def optimize_layer(
         List of image settings dictionaries
     images : dict[str, Image.Image]
         Dictionary mapping filenames to PIL Image objects
+    max_workers : int, optional
+        Number of threads used to partition the images, by default 1. Layers optimized in worker processes keep
+        the default, so there is only one level of parallelism.
 
     Returns
     -------
@@ -144,6 +188,7 @@ def optimize_layer(
     settings_groups = group_by_settings(image_settings)
     new_settings = []
     new_images = {}  # Will only contain newly created images
+    scratch = None  # Composite buffer shared by every partition in this layer
 
     # Process each group of images with the same settings
     for group_idx, group_settings in enumerate(settings_groups.values()):
@@ -158,12 +203,14 @@ def optimize_layer(
         # Sort by exposure time to process in order
         group_settings.sort(key=lambda x: x["Layer exposure time (ms)"])
 
-        # Create a dictionary of images for this group
-        group_images_dict = {s["Image file"]: images[s["Image file"]].copy() for s in group_settings}
+        # Convert each image in this group to an array once, for both partitioning and compositing
+        group_arrays = {s["Image file"]: np.asarray(images[s["Image file"]]) for s in group_settings}
+
+        group_bboxes = {name: get_bbox(arr) for name, arr in group_arrays.items()}
 
         # Use graph coloring to partition images into non-overlapping groups
         logger.debug("Partitioning images in group %d using graph coloring", group_idx)
-        partitioned_groups = partition_images(group_images_dict)
+        partitioned_groups = partition_images(group_arrays, group_bboxes, max_workers)
 
         # Process each non-overlapping partition
         for partition_idx, image_names in partitioned_groups.items():
@@ -171,11 +218,19 @@ def optimize_layer(
 
             # Get settings and images for this partition
             settings = [s for s in group_settings if s["Image file"] in image_names]
-            images = [group_images_dict[name] for name in image_names]
+            partition_arrays = [group_arrays[s["Image file"]] for s in settings]
+            partition_bboxes = [group_bboxes[s["Image file"]] for s in settings]
 
             # Create optimized exposures by combining images in this partition
             logger.debug("Optimizing exposures for partition %d", partition_idx)
-            optimized_settings, optimized_images = combine_exposures(settings, images)
+            if scratch is None:
+                scratch = np.zeros(partition_arrays[0].shape, dtype=np.uint8)
+            optimized_settings, optimized_images = combine_exposures(
+                settings,
+                partition_arrays,
+                partition_bboxes,
+                scratch,
+            )
             new_settings.extend(optimized_settings)
             new_images.update(optimized_images)
             logger.debug("Created %d optimized images for partition %d", len(optimized_images), partition_idx)
@@ -189,34 +244,20 @@ def optimize_layer(
     return new_settings, new_images
 
 
-def optimize_print_settings(
-    print_settings: dict[str, Any],
-    images: dict[str, Image.Image],
-) -> tuple[dict[str, Any], dict[str, Image.Image]]:
-    """Optimize print settings by combining non-overlapping images with similar settings.
-
-    Parameters
-    ----------
-    print_settings : dict[str, Any]
-        Dictionary containing print settings including layers.
-    images : dict[str, Image.Image]
-        Dictionary mapping filenames to PIL Image objects.
-
-    Returns
-    -------
-    tuple[dict[str, Any], dict[str, Image.Image]]
-        Tuple containing optimized settings and images.
+def _layers_to_optimize(
+    layers: list[dict[str, Any]],
+    images: dict[str, Image.Image] | LazyImageStore,
+) -> list[tuple[int, list[dict[str, Any]], list[str]]]:
+    """Find the layers that have images to optimize.
 
+    Returns the index, image settings list, and available image names of each such layer, without loading any
+    images.
     """
-    logger.info("Starting print settings optimization with %d images", len(images))
-    new_settings = copy.deepcopy(print_settings)
-    all_images = copy.deepcopy(images)  # Deep copy to avoid modifying original images
-
-    total_layers = len(new_settings.get("Layers", []))
+    total_layers = len(layers)
     logger.info("Processing %d layers", total_layers)
 
-    # Process each layer
-    for i, layer in enumerate(new_settings.get("Layers", [])):
+    layers_to_optimize = []
+    for i, layer in enumerate(layers):
         logger.debug("Processing layer %d/%d", i + 1, total_layers)
 
         # Get image settings and filter for valid images
@@ -226,22 +267,89 @@ def optimize_print_settings(
             continue
 
         # Get only the images needed for this layer's settings
-        layer_images = {}
+        names = []
         for img_setting in image_settings:
             img_name = img_setting["Image file"]
-            if img_name in all_images:
-                layer_images[img_name] = all_images[img_name]
+            if img_name in images:
+                names.append(img_name)
             else:
                 logger.warning("Image %s not found in available images", img_name)
 
         # Skip layers with no valid images
-        if not layer_images:
+        if not names:
             logger.debug("Skipping layer %d: no valid images found", i + 1)
             continue
 
-        logger.info("Optimizing layer %d with %d images", i + 1, len(layer_images))
-        optimized_settings, new_images = optimize_layer(image_settings, layer_images)
+        layers_to_optimize.append((i, image_settings, names))
+    return layers_to_optimize
+
+
+def _optimize_layers_parallel(
+    jobs: Iterable[tuple[list[dict[str, Any]], dict[str, Image.Image]]],
+    workers: int,
+) -> Iterator[tuple[list[dict[str, Any]], dict[str, Image.Image]]]:
+    """Optimize layers on a pool of worker processes, yielding the results in order.
+
+    Only a few layers per worker are submitted ahead of the results being consumed, so a generator of layers is
+    still consumed a few layers at a time.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: deque[Future[tuple[list[dict[str, Any]], dict[str, Image.Image]]]] = deque()
+        for image_settings, layer_images in jobs:
+            pending.append(executor.submit(optimize_layer, image_settings, layer_images))
+            if len(pending) >= PARALLEL_QUEUE_DEPTH * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def optimize_print_settings(
+    print_settings: dict[str, Any],
+    images: dict[str, Image.Image] | LazyImageStore,
+) -> tuple[dict[str, Any], dict[str, Image.Image] | LazyImageStore]:
+    """Optimize print settings by combining non-overlapping images with similar settings.
+
+    Parameters
+    ----------
+    print_settings : dict[str, Any]
+        Dictionary containing print settings including layers.
+    images : dict[str, Image.Image] | LazyImageStore
+        Dictionary mapping filenames to PIL Image objects, or a store that loads them on demand.
+
+    Returns
+    -------
+    tuple[dict[str, Any], dict[str, Image.Image] | LazyImageStore]
+        Tuple containing optimized settings and images. The images are of the same kind as those given.
+
+    """
+    logger.info("Starting print settings optimization with %d images", len(images))
+    # Only the layers' image settings lists are replaced, so copy just the layer dicts rather than the whole tree
+    new_settings = dict(print_settings)
+    if "Layers" in new_settings:
+        new_settings["Layers"] = [dict(layer) for layer in new_settings["Layers"]]
+    all_images = images.copy()  # Images are only read, so sharing them with the caller is safe
+
+    # Collect the layers to optimize, with the names of the images they need
+    layers_to_optimize = _layers_to_optimize(new_settings.get("Layers", []), all_images)
+    layer_indices = [i for i, _, _ in layers_to_optimize]
+
+    def layer_jobs() -> Iterator[tuple[list[dict[str, Any]], dict[str, Image.Image]]]:
+        # Fetch each layer's images only when it is optimized, so lazily loaded images are not all held at once
+        for i, image_settings, names in layers_to_optimize:
+            logger.info("Optimizing layer %d with %d images", i + 1, len(names))
+            yield image_settings, {name: all_images[name] for name in names}
+
+    # Layers are independent, so spread them across processes when there are enough to repay the start-up cost
+    workers = min(os.cpu_count() or 1, len(layer_indices))
+    if len(layer_indices) >= PARALLEL_MIN_LAYERS and workers > 1:
+        logger.info("Optimizing %d layers across %d worker processes", len(layer_indices), workers)
+        results = _optimize_layers_parallel(layer_jobs(), workers)
+    else:
+        # Layers run one at a time here, so each layer may use threads of its own
+        threads = os.cpu_count() or 1
+        results = (optimize_layer(settings, layer_images, threads) for settings, layer_images in layer_jobs())
 
+    for i, (optimized_settings, new_images) in zip(layer_indices, results, strict=True):
         # Update the layer with optimized settings
         new_settings["Layers"][i]["Image settings list"] = optimized_settings
 
@@ -270,16 +378,17 @@ def optimize_print_file(input_path: Path, output_path: Path | None = None) -> No
     logger.info("Starting print file optimization: %s → %s", input_path, output_path)
 
     try:
-        logger.info("Loading print file from %s", input_path)
-        print_settings, images = load_print_file(input_path)
-        logger.debug("Loaded %d images from input file", len(images))
+        logger.info("Opening print file %s", input_path)
+        print_settings, images = open_print_file(input_path)
+        with images:
+            logger.debug("Found %d images in input file", len(images))
 
-        logger.info("Optimizing print settings")
-        optimized_settings, all_images = optimize_print_settings(print_settings, images)
-        logger.debug("Optimization complete: %d total images after optimization", len(all_images))
+            logger.info("Optimizing print settings")
+            optimized_settings, all_images = optimize_print_settings(print_settings, images)
+            logger.debug("Optimization complete: %d total images after optimization", len(all_images))
 
-        logger.info("Saving optimized files to %s", output_path)
-        save_print_file(output_path, optimized_settings, all_images)
+            logger.info("Saving optimized files to %s", output_path)
+            save_print_file(output_path, optimized_settings, all_images)
         logger.info("Optimization complete! Files saved successfully")
 
     except Exception:
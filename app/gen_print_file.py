@@ -1,19 +1,63 @@
 """Generate a new print file with scaled exposure settings and composite images."""
 
-import copy
 import logging
+from collections import defaultdict
+from collections.abc import Iterator, Mapping
 from pathlib import Path
 
-from PIL import Image, ImageChops
+import numpy as np
+from PIL import Image
 
 from app.constants import CANVAS_HEIGHT, CANVAS_WIDTH
 from app.exposure_optimizer import optimize_print_settings
-from app.print_file_utils import load_print_file, save_print_file
+from app.print_file_utils import open_print_file, save_print_file
 
 logger = logging.getLogger(__name__)
 
 
-def gen_group_composite(base_image: Image.Image, group_settings: list[dict]) -> Image.Image:
+def _placement_slices(
+    group_settings: list[dict],
+    base_shape: tuple[int, int],
+) -> list[tuple[tuple[slice, slice], tuple[slice, slice]]]:
+    """Compute where each copy of a base image of the given shape lands on the canvas.
+
+    Parameters
+    ----------
+    group_settings : list[dict]
+        List of dictionaries containing 'x' and 'y' offsets where the base image should be placed.
+    base_shape : tuple[int, int]
+        Height and width of the base image.
+
+    Returns
+    -------
+    list[tuple[tuple[slice, slice], tuple[slice, slice]]]
+        For each copy that is at least partly on the canvas, the canvas region it covers and the matching region
+        of the base image, both clipped to the canvas as paste does.
+
+    """
+    base_height, base_width = base_shape
+    slices = []
+    for component in group_settings:
+        offset_x = component["x"]
+        offset_y = component["y"]
+        x1, y1 = max(offset_x, 0), max(offset_y, 0)
+        x2, y2 = min(offset_x + base_width, CANVAS_WIDTH), min(offset_y + base_height, CANVAS_HEIGHT)
+        if x1 >= x2 or y1 >= y2:
+            continue
+        slices.append(
+            (
+                (slice(y1, y2), slice(x1, x2)),
+                (slice(y1 - offset_y, y2 - offset_y), slice(x1 - offset_x, x2 - offset_x)),
+            ),
+        )
+    return slices
+
+
+def gen_group_composite(
+    base_image: Image.Image,
+    group_settings: list[dict],
+    slices: list[tuple[tuple[slice, slice], tuple[slice, slice]]] | None = None,
+) -> Image.Image:
     """Generate a composite image by placing the base image in multiple positions.
 
     Parameters
@@ -22,6 +66,9 @@ def gen_group_composite(base_image: Image.Image, group_settings: list[dict]) ->
         The base image to copy for each part.
     group_settings : list[dict]
         List of dictionaries containing 'x' and 'y' offsets where the base image should be placed.
+    slices : list[tuple[tuple[slice, slice], tuple[slice, slice]]] | None, optional
+        Placements of the base image precomputed by _placement_slices, by default None to compute them from
+        group_settings.
 
     Returns
     -------
@@ -29,14 +76,56 @@ def gen_group_composite(base_image: Image.Image, group_settings: list[dict]) ->
         The composite image combining all parts.
 
     """
-    composite_image = Image.new("L", (CANVAS_WIDTH, CANVAS_HEIGHT), color=0)
-    for component in group_settings:
-        offset_x = component["x"]
-        offset_y = component["y"]
-        temp_img = Image.new("L", (CANVAS_WIDTH, CANVAS_HEIGHT), color=0)
-        temp_img.paste(base_image, (offset_x, offset_y))
-        composite_image = ImageChops.lighter(composite_image, temp_img)
-    return composite_image
+    base = np.asarray(base_image, dtype=np.uint8)
+    if slices is None:
+        slices = _placement_slices(group_settings, base.shape)
+    composite = np.zeros((CANVAS_HEIGHT, CANVAS_WIDTH), dtype=np.uint8)
+
+    # Merge each copy's footprint into the composite in place
+    for canvas_slice, base_slice in slices:
+        region = composite[canvas_slice]
+        np.maximum(region, base[base_slice], out=region)
+    return Image.fromarray(composite)
+
+
+def _render_composites(
+    old_images: Mapping[str, Image.Image],
+    composites: dict[str, tuple[str, str]],
+    groups: dict[str, list[dict]],
+) -> Iterator[tuple[str, Image.Image]]:
+    """Generate composite images one at a time.
+
+    The composites of each input image are generated together, so each input image is fetched only once.
+
+    Parameters
+    ----------
+    old_images : Mapping[str, Image.Image]
+        Images of the input print file, by filename.
+    composites : dict[str, tuple[str, str]]
+        The input image and group name of each composite, by output filename.
+    groups : dict[str, list[dict]]
+        Component positions of each group, by group name.
+
+    Yields
+    ------
+    tuple[str, Image.Image]
+        Output filename and composite image.
+
+    """
+    # The placements depend only on the group and the image size, so they are computed once for all layers
+    placements: dict[tuple[str, tuple[int, int]], list[tuple[tuple[slice, slice], tuple[slice, slice]]]] = {}
+    by_source: dict[str, list[tuple[str, str]]] = defaultdict(list)
+    for new_name, (old_name, group_name) in composites.items():
+        by_source[old_name].append((new_name, group_name))
+
+    for old_name, targets in by_source.items():
+        old_image = old_images[old_name]
+        for new_name, group_name in targets:
+            logger.debug("Generating composite for image %s in group %s", old_name, group_name)
+            key = (group_name, (old_image.height, old_image.width))
+            if key not in placements:
+                placements[key] = _placement_slices(groups[group_name], key[1])
+            yield new_name, gen_group_composite(old_image, groups[group_name], placements[key])
 
 
 def create_exposure_config(layout_data: list) -> dict:
@@ -98,11 +187,40 @@ def new_print_file(input_path: Path, output_path: Path, layout_data: list, *, op
 
     exposure_config = create_exposure_config(layout_data)
 
-    logger.info("Loading input print file")
-    print_settings, old_images = load_print_file(input_path)
-    logger.debug("Loaded %d images from input file", len(old_images))
+    # Input images are decoded only when their composites are generated
+    logger.info("Opening input print file")
+    print_settings, old_images = open_print_file(input_path)
+    with old_images:
+        _write_new_print_file(output_path, print_settings, old_images, exposure_config, optimize=optimize)
+    logger.info("Print file generated successfully")
+
+
+def _write_new_print_file(
+    output_path: Path,
+    print_settings: dict,
+    old_images: Mapping[str, Image.Image],
+    exposure_config: dict,
+    *,
+    optimize: bool,
+) -> None:
+    """Rewrite the layers of an input print file for each exposure group and save the result.
 
-    new_images: dict[str, Image.Image] = {}
+    Parameters
+    ----------
+    output_path : Path
+        Path for the output .zip file.
+    print_settings : dict
+        Print settings of the input print file, whose layers are replaced.
+    old_images : Mapping[str, Image.Image]
+        Images of the input print file, by filename.
+    exposure_config : dict
+        Exposure groups created by create_exposure_config.
+    optimize : bool
+        If True, run additional layer optimization.
+
+    """
+    # Input image and group of each composite, so the composites can be generated one at a time while saving
+    composites: dict[str, tuple[str, str]] = {}
 
     # Process each layer
     layers_count = len(print_settings.get("Layers", []))
@@ -124,16 +242,13 @@ def new_print_file(input_path: Path, output_path: Path, layout_data: list, *, op
 
             for old_setting in old_image_settings:
                 old_name = old_setting["Image file"]
-                old_img = old_images[old_name]
-
-                logger.debug("Generating composite for image %s in group %s", old_name, group_name)
-                composite_img = gen_group_composite(old_img, group_settings)
-
                 basename, ext = old_name.rsplit(".", 1)
                 new_name = f"{basename}_{group_name}.{ext}"
-                new_images[new_name] = composite_img
 
-                new_setting = copy.deepcopy(old_setting)
+                # The composite depends only on the image and group, so layers reusing a slice share it
+                composites.setdefault(new_name, (old_name, group_name))
+
+                new_setting = dict(old_setting)
                 new_setting["Image file"] = new_name
                 if "Layer exposure time (ms)" in new_setting:
                     original_exposure = new_setting["Layer exposure time (ms)"]
@@ -154,13 +269,14 @@ def new_print_file(input_path: Path, output_path: Path, layout_data: list, *, op
             len(new_image_settings),
         )
 
-    logger.info("Created %d composite images", len(new_images))
+    logger.info("Creating %d composite images", len(composites))
+    new_images = _render_composites(old_images, composites, exposure_config["groups"])
 
+    # Optimization needs every composite at once; otherwise each one is written out and released as it is generated
     if optimize:
         logger.info("Running exposure optimization")
-        print_settings, new_images = optimize_print_settings(print_settings, new_images)
+        print_settings, new_images = optimize_print_settings(print_settings, dict(new_images))
         logger.info("Optimization complete, %d total images", len(new_images))
 
     logger.info("Saving print file to %s", output_path)
     save_print_file(output_path, print_settings, new_images)
-    logger.info("Print file generated successfully")
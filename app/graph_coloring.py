@@ -2,121 +2,242 @@
 
 import logging
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
-import networkx as nx
-from PIL import Image, ImageChops
+import numpy as np
+from PIL import Image
 
 logger = logging.getLogger(__name__)
 
 
-def check_overlap(img1: Image.Image, img2: Image.Image) -> bool:
-    """Efficiently check if two images have overlapping white pixels."""
-    # First check bounding boxes for quick rejection
-    bbox1 = img1.getbbox()
-    bbox2 = img2.getbbox()
+# Number of pixels packed into each word of a bitmap
+WORD_BITS = 64
+
+# Number of bitmap rows summarized by each row of a coarse occupancy mask
+COARSE_ROWS = 64
+
+
+def get_bbox(mask: np.ndarray) -> tuple[int, int, int, int] | None:
+    """Return the bounding box of the non-zero pixels of a mask, or None if it is empty, like ``Image.getbbox``."""
+    rows = np.flatnonzero(mask.any(axis=1))
+    if not rows.size:
+        return None
+    top, bottom = int(rows[0]), int(rows[-1]) + 1
+    cols = np.flatnonzero(mask[top:bottom].any(axis=0))
+    return int(cols[0]), top, int(cols[-1]) + 1, bottom
+
+
+def _pack_mask(img: Image.Image | np.ndarray) -> np.ndarray:
+    """Pack the non-zero pixels of an image into a bitmap of 64-bit words, one bit per pixel.
+
+    Each row is padded to a whole number of words, so word ``w`` of a row holds pixels ``64 * w`` to
+    ``64 * w + 63`` and an AND of two bitmaps tests 64 pixels per operation.
+    """
+    bits = np.packbits(np.asarray(img) != 0, axis=1)
+    pad = -bits.shape[1] % (WORD_BITS // 8)
+    if pad:
+        bits = np.pad(bits, ((0, 0), (0, pad)))
+    return np.ascontiguousarray(bits).view(np.uint64)
+
+
+def _coarse_mask(bits: np.ndarray) -> np.ndarray:
+    """Summarize a packed bitmap as a boolean mask with one entry per word column and block of COARSE_ROWS rows.
+
+    An entry is set if any pixel in its 64 by COARSE_ROWS block is set, so two images whose coarse masks share no
+    entry cannot share a pixel.
+    """
+    occupied = bits != 0
+    pad = -occupied.shape[0] % COARSE_ROWS
+    if pad:
+        occupied = np.pad(occupied, ((0, pad), (0, 0)))
+    return occupied.reshape(-1, COARSE_ROWS, occupied.shape[1]).any(axis=1)
+
 
+def _intersection(
+    bbox1: tuple[int, int, int, int] | None,
+    bbox2: tuple[int, int, int, int] | None,
+) -> tuple[int, int, int, int] | None:
+    """Return the intersection of two bounding boxes, or None if either is missing or they do not overlap."""
     if bbox1 is None or bbox2 is None:
-        return False  # One image is empty
+        return None  # One image is empty
 
     # Check if bounding boxes overlap
     x1, y1, x2, y2 = bbox1
     x3, y3, x4, y4 = bbox2
 
     if x2 <= x3 or x4 <= x1 or y2 <= y3 or y4 <= y1:
-        return False  # Bounding boxes don't overlap
+        return None  # Bounding boxes don't overlap
 
-    # Find the overlapping region
-    overlap_bbox = (max(x1, x3), max(y1, y3), min(x2, x4), min(y2, y4))
+    return max(x1, x3), max(y1, y3), min(x2, x4), min(y2, y4)
 
-    # Crop to the overlapping region
-    crop1 = img1.crop(overlap_bbox)
-    crop2 = img2.crop(overlap_bbox)
 
-    # Check if any pixels overlap
-    overlap = ImageChops.multiply(crop1, crop2)
-    return overlap.getbbox() is not None
+def _coarse_overlap(coarse1: np.ndarray, coarse2: np.ndarray, region: tuple[int, int, int, int]) -> bool:
+    """Check if two coarse masks share an occupied block within a region of the canvas.
+
+    A False result means the images cannot share a pixel there, so sparse images that only interleave are
+    rejected without scanning their bitmaps.
+    """
+    left, top, right, bottom = region
+    rows = slice(top // COARSE_ROWS, -(-bottom // COARSE_ROWS))
+    cols = slice(left // WORD_BITS, -(-right // WORD_BITS))
+    return bool(np.logical_and(coarse1[rows, cols], coarse2[rows, cols]).any())
+
 
+def _masks_overlap(
+    bits1: np.ndarray,
+    bits2: np.ndarray,
+    region: tuple[int, int, int, int],
+    scratch: np.ndarray | None = None,
+) -> bool:
+    """Check if two packed bitmaps share a set pixel within a region, such as their bounding box intersection.
 
-def create_spatial_grid(images: dict[str, Image.Image], grid_size: int = 10) -> dict[tuple[int, int], list[str]]:
-    """Create a spatial grid for efficient overlap detection."""
-    grid_cells: dict[tuple[int, int], list[str]] = defaultdict(list)
+    Any shared pixel lies inside both bounding boxes, so scanning the whole words spanning the intersection
+    cannot report a false overlap. If given, ``scratch`` must be at least as large as that window.
+    """
+    # Widen the region to whole words
+    left, top, right, bottom = region
+    first_word, last_word = left // WORD_BITS, -(-right // WORD_BITS)
+    window1 = bits1[top:bottom, first_word:last_word]
+    window2 = bits2[top:bottom, first_word:last_word]
 
-    # Assign images to grid cells
-    for filename, img in images.items():
-        bbox = img.getbbox()
-        if bbox is None:
-            continue
+    # Check if any pixels overlap
+    if scratch is None:
+        return bool(np.bitwise_and(window1, window2).any())
+    out = scratch[: bottom - top, : last_word - first_word]
+    np.bitwise_and(window1, window2, out=out)
+    return bool(out.any())
 
-        x1, y1, x2, y2 = bbox
-        width, height = img.size
 
-        # Calculate grid cells
-        cell_x1 = max(0, x1 * grid_size // width)
-        cell_y1 = max(0, y1 * grid_size // height)
-        cell_x2 = min(grid_size - 1, x2 * grid_size // width)
-        cell_y2 = min(grid_size - 1, y2 * grid_size // height)
+def check_overlap(img1: Image.Image, img2: Image.Image) -> bool:
+    """Efficiently check if two images have overlapping white pixels."""
+    region = _intersection(img1.getbbox(), img2.getbbox())
+    return region is not None and _masks_overlap(_pack_mask(img1), _pack_mask(img2), region)
 
-        for x in range(cell_x1, cell_x2 + 1):
-            for y in range(cell_y1, cell_y2 + 1):
-                grid_cells[(x, y)].append(filename)
 
-    return grid_cells
+def find_candidate_pairs(bboxes: dict[str, tuple[int, int, int, int] | None]) -> list[tuple[str, str]]:
+    """Find the pairs of images whose bounding boxes intersect, using a sweep along the x axis.
+
+    Boxes are visited in order of their left edge while keeping the boxes still open at that edge, so each box is
+    only compared against boxes it shares x extent with, instead of against every other box.
+    """
+    boxes = sorted(((bbox, filename) for filename, bbox in bboxes.items() if bbox is not None), key=lambda b: b[0][0])
+    pairs: list[tuple[str, str]] = []
+    active: list[tuple[tuple[int, int, int, int], str]] = []
+    for bbox, filename in boxes:
+        x1, y1, _, y2 = bbox
+        active = [entry for entry in active if entry[0][2] > x1]
+        pairs.extend((other, filename) for (_, y3, _, y4), other in active if y1 < y4 and y3 < y2)
+        active.append((bbox, filename))
+    return pairs
 
 
 def build_conflict_graph(
-    images: dict[str, Image.Image],
-    grid_cells: dict[tuple[int, int], list[str]],
-) -> tuple[nx.Graph, int]:
-    """Build a graph where nodes are images and edges represent overlaps."""
+    images: dict[str, np.ndarray],
+    bboxes: dict[str, tuple[int, int, int, int] | None],
+    candidate_pairs: list[tuple[str, str]],
+    max_workers: int = 1,
+) -> tuple[dict[str, list[str]], int]:
+    """Build a graph where nodes are images and edges represent overlaps.
+
+    The graph is returned as an adjacency mapping from each image to the images it overlaps. The images are packed
+    on up to ``max_workers`` threads; callers already running in parallel leave it at 1 so the CPUs are not
+    oversubscribed.
+    """
     # Build the conflict graph
-    graph = nx.Graph()
-    for filename in images:
-        graph.add_node(filename)
+    graph: dict[str, list[str]] = {filename: [] for filename in images}
+
+    # Pack each image that takes part in a candidate pair once, rather than once per pair. Packing is whole-image
+    # NumPy work that releases the GIL, so the images can be packed on a thread pool.
+    names = list(dict.fromkeys(filename for pair in candidate_pairs for filename in pair))
+    if max_workers > 1 and len(names) > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            masks = dict(zip(names, executor.map(_pack_mask, (images[filename] for filename in names)), strict=True))
+    else:
+        masks = {filename: _pack_mask(images[filename]) for filename in names}
+    coarse = {filename: _coarse_mask(bits) for filename, bits in masks.items()}
+    scratch_shape = tuple(map(max, zip(*(bits.shape for bits in masks.values()), strict=True))) if masks else (0, 0)
+    scratch = np.empty(scratch_shape, dtype=np.uint64)
 
     # Check for overlaps
-    logger.info("Checking for overlaps between images")
-    checked_pairs: set[tuple[str, str]] = set()
+    logger.info("Checking for overlaps between %d candidate image pairs", len(candidate_pairs))
     overlap_count = 0
 
-    for cell_images in grid_cells.values():
-        for i in range(len(cell_images)):
-            for j in range(i + 1, len(cell_images)):
-                img1_name = cell_images[i]
-                img2_name = cell_images[j]
-
-                # Skip if already checked
-                pair = tuple(sorted([img1_name, img2_name]))
-                if pair in checked_pairs:
-                    continue
-                checked_pairs.add(pair)
-
-                # Check for overlap
-                img1 = images[img1_name]
-                img2 = images[img2_name]
-
-                if check_overlap(img1, img2):
-                    graph.add_edge(img1_name, img2_name)
-                    overlap_count += 1
+    for img1_name, img2_name in candidate_pairs:
+        region = _intersection(bboxes[img1_name], bboxes[img2_name])
+        if (
+            region is not None
+            and _coarse_overlap(coarse[img1_name], coarse[img2_name], region)
+            and _masks_overlap(masks[img1_name], masks[img2_name], region, scratch)
+        ):
+            graph[img1_name].append(img2_name)
+            graph[img2_name].append(img1_name)
+            overlap_count += 1
 
     return graph, overlap_count
 
 
-def partition_images(images: dict[str, Image.Image]) -> dict[int, list[str]]:
-    """Partition images into non-overlapping groups using graph coloring."""
+def greedy_color(graph: dict[str, list[str]]) -> dict[str, int]:
+    """Color a graph greedily, visiting nodes in order of decreasing degree.
+
+    This is the same "largest first" coloring as networkx, but each node keeps a bitmask of the colors already taken
+    by its neighbors, so choosing a color is a single bit trick instead of building a set of neighbor colors.
+
+    Parameters
+    ----------
+    graph : dict[str, list[str]]
+        Adjacency mapping from each node to its neighbors.
+
+    Returns
+    -------
+    dict[str, int]
+        The color of each node, in the order the nodes were colored.
+
+    """
+    taken = dict.fromkeys(graph, 0)
+    coloring: dict[str, int] = {}
+    for node in sorted(graph, key=lambda node: len(graph[node]), reverse=True):
+        # The lowest clear bit of the mask is the smallest color no neighbor uses
+        used = taken[node]
+        color = (~used & (used + 1)).bit_length() - 1
+        coloring[node] = color
+        for neighbor in graph[node]:
+            taken[neighbor] |= 1 << color
+    return coloring
+
+
+def partition_images(
+    images: dict[str, Image.Image] | dict[str, np.ndarray],
+    bboxes: dict[str, tuple[int, int, int, int] | None] | None = None,
+    max_workers: int = 1,
+) -> dict[int, list[str]]:
+    """Partition images into non-overlapping groups using graph coloring.
+
+    Images may be given as PIL images or as 2D arrays; each is converted to an array only once. Bounding boxes
+    already known to the caller can be passed in so they are not computed again. ``max_workers`` is passed on to
+    `build_conflict_graph`.
+    """
     logger.info("Starting partitioning of %d images", len(images))
+    images = {filename: np.asarray(img) for filename, img in images.items()}
+
+    # Find the pairs of images whose bounding boxes intersect
+    if bboxes is None:
+        bboxes = {filename: get_bbox(mask) for filename, mask in images.items()}
+    candidate_pairs = find_candidate_pairs(bboxes)
 
-    # Create spatial grid for overlap detection
-    grid_cells = create_spatial_grid(images)
+    # With no intersecting bounding boxes nothing can overlap, so all images fit in one group
+    if images and not candidate_pairs:
+        logger.info("No image bounding boxes intersect, partitioned into 1 group")
+        return {0: list(images)}
 
     # Build conflict graph
-    graph, overlap_count = build_conflict_graph(images, grid_cells)
+    graph, overlap_count = build_conflict_graph(images, bboxes, candidate_pairs, max_workers)
 
     logger.info("Found %d overlapping image pairs", overlap_count)
-    logger.info("Graph has %d nodes and %d edges", graph.number_of_nodes(), graph.number_of_edges())
+    logger.info("Graph has %d nodes and %d edges", len(graph), overlap_count)
 
     # Apply graph coloring
     logger.info("Applying graph coloring")
-    coloring = nx.coloring.greedy_color(graph, strategy="largest_first")
+    coloring = greedy_color(graph)
 
     # Group by color
     groups: dict[int, list[str]] = defaultdict(list)
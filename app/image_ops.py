@@ -12,7 +12,7 @@ RegionBBox = tuple[int, int, int, int]  # (x_min, y_min, x_max, y_max)
 
 
 def merge_slices(input_zip: str) -> Image.Image:
-    """Read all slice images from input_zip and combine them using ImageChops.lighter."""
+    """Read all slice images from input_zip and combine them into one grayscale image using ImageChops.lighter."""
     with zipfile.ZipFile(input_zip, "r") as zf:
         slices = [n for n in zf.namelist() if n.startswith("slices/") and not n.endswith("/")]
         if not slices:
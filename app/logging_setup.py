@@ -1,13 +1,106 @@
 """Unified logging configuration for the application."""
 
+import atexit
 import logging
 import os
+import queue
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
 from pathlib import Path
 
+# Number of records buffered before they are written to the log file together
+LOG_BUFFER_CAPACITY = 512
+
+# Seconds a record may wait in the buffer before it is written
+LOG_FLUSH_INTERVAL_S = 1.0
+
+# Background listener that writes queued records to the real handlers, replaced on each setup_logging call
+_listener: QueueListener | None = None
+
+# Whether the hooks that hand logging over around a fork have been registered; they cannot be unregistered
+_fork_hooks_registered = False
+
+
+class _BufferingFileHandler(MemoryHandler):
+    """Buffer records for a file handler and write them in batches.
+
+    The buffer is written when it is full, when a record of level ERROR or above arrives, or when the oldest
+    buffered record is LOG_FLUSH_INTERVAL_S old. The listener also writes it out when it has been idle that long.
+    """
+
+    def shouldFlush(self, record: logging.LogRecord) -> bool:  # noqa: N802
+        """Return whether the buffer should be written after adding a record."""
+        return super().shouldFlush(record) or record.created - self.buffer[0].created >= LOG_FLUSH_INTERVAL_S
+
+
+class _FlushingQueueListener(QueueListener):
+    """Queue listener that also writes out buffered records when no new record arrives for a while.
+
+    The buffer's own age check only runs as records arrive, so without this an idle application could hold its
+    last records in memory indefinitely.
+    """
+
+    def dequeue(self, block: bool) -> logging.LogRecord:  # noqa: FBT001
+        """Return the next queued record, flushing the handlers every LOG_FLUSH_INTERVAL_S while waiting."""
+        if not block:
+            return self.queue.get_nowait()
+        while True:
+            try:
+                return self.queue.get(timeout=LOG_FLUSH_INTERVAL_S)
+            except queue.Empty:
+                for handler in self.handlers:
+                    handler.flush()
+
+
+def _drain_listener() -> None:
+    """Stop the background listener after it has handled every queued record, and write out its buffers."""
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.flush()
+
+
+def _stop_listener() -> None:
+    """Stop the background listener, writing out any records still queued or buffered."""
+    global _listener  # noqa: PLW0603
+    _drain_listener()
+    _listener = None
+
+
+def _restart_listener() -> None:
+    """Restart the background listener stopped before a fork."""
+    if _listener is not None:
+        _listener.start()
+
+
+def _log_directly() -> None:
+    """Attach the real handlers to the root logger in place of the queue.
+
+    A forked worker process inherits the queue but not the listener thread, so without this its records would
+    never be written. Workers exit without flushing buffers either, so they write to the log file unbuffered.
+    The parent's records are all written out before the fork, so the workers' records follow them in the file.
+    The child drops its copy of the stopped listener, so exiting does not try to stop it again.
+    """
+    global _listener  # noqa: PLW0603
+    if _listener is None:
+        return
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        if isinstance(handler, QueueHandler):
+            root_logger.removeHandler(handler)
+    for handler in _listener.handlers:
+        root_logger.addHandler(handler.target if isinstance(handler, MemoryHandler) else handler)
+    _listener = None
+
+
+atexit.register(_stop_listener)
+
 
 def setup_logging(log_level: int = logging.INFO, log_file: str = None) -> None:
     """Set up logging configuration for the entire application.
 
+    Records are put on a queue and written to the log file and console by a background thread, so logging calls
+    in the image processing code do not wait on I/O. The log file is written in batches of records.
+
     Parameters
     ----------
     log_level : int, optional
@@ -15,6 +108,8 @@ def setup_logging(log_level: int = logging.INFO, log_file: str = None) -> None:
     log_file : str, optional
         Path to the log file, defaults to 'logs/app.log'
     """
+    global _listener, _fork_hooks_registered  # noqa: PLW0603
+
     # Create logs directory if it doesn't exist
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
@@ -41,11 +136,26 @@ def setup_logging(log_level: int = logging.INFO, log_file: str = None) -> None:
     root_logger.setLevel(log_level)
 
     # Remove any existing handlers to avoid duplicates when re-configuring
+    _stop_listener()
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
 
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    # The format uses none of the caller, thread, or process details, so skip collecting them for every record
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    logging._srcfile = None  # noqa: SLF001
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    root_logger.addHandler(QueueHandler(log_queue))
+    buffered_file_handler = _BufferingFileHandler(LOG_BUFFER_CAPACITY, flushLevel=logging.ERROR, target=file_handler)
+    _listener = _FlushingQueueListener(log_queue, buffered_file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+
+    # Forked workers must take over logging from the queue; only processes that set up logging need the hooks
+    if not _fork_hooks_registered and hasattr(os, "register_at_fork"):
+        os.register_at_fork(before=_drain_listener, after_in_parent=_restart_listener, after_in_child=_log_directly)
+        _fork_hooks_registered = True
 
     logger = logging.getLogger(__name__)
     logger.info("Logging initialized: level=%s, file=%s", logging.getLevelName(log_level), log_file)
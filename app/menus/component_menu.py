@@ -5,7 +5,6 @@ from tkinter import messagebox, simpledialog
 from typing import TYPE_CHECKING
 
 from app.component import Component
-from app.component_selector import ComponentSelector
 from app.menus.menu import Menu
 from app.tile_dialog import TileDialog
 
@@ -91,4 +90,7 @@ class ComponentMenu(Menu):
 
     def run_cutout_tool(self) -> None:
         """Launch the component cutout tool."""
+        # Imported on use: the cutout tool pulls in NumPy, SciPy and ImageTk, which most sessions never need
+        from app.component_selector import ComponentSelector  # noqa: PLC0415
+
         ComponentSelector(parent=self.app.root)
@@ -7,8 +7,6 @@ from pathlib import Path
 from tkinter import filedialog, messagebox
 
 from app.component import Component
-from app.gen_print_file import new_print_file
-from app.image_ops import get_component_dimensions
 from app.menus.menu import Menu
 from app.popup import Popup
 
@@ -44,6 +42,9 @@ class FileMenu(Menu):
 
     def load_component(self) -> None:
         """Prompt user to select a component zip and store its dimensions."""
+        # Imported on use: image_ops pulls in NumPy and SciPy, which would otherwise slow down every launch
+        from app.image_ops import get_component_dimensions  # noqa: PLC0415
+
         file_path = filedialog.askopenfilename(title="Select component zip file", filetypes=[("Zip", "*.zip")])
         if not file_path:
             return
@@ -137,23 +138,20 @@ class FileMenu(Menu):
         """
         overlapping_components = set()
 
-        # Get all components in a flat list
-        all_components = [comp for group in self.app.groups.values() for comp in group]
+        width = self.app.comp_width
+        height = self.app.comp_height
 
-        # Start with each component
-        for i, c1 in enumerate(all_components):
-            c1_left = c1.x
-            c1_right = c1_left + self.app.comp_width
-            c1_top = c1.y
-            c1_bottom = c1_top + self.app.comp_height
+        # Get all components and their bounds in a flat list, computed once rather than per pair
+        all_bounds = [
+            (comp, comp.x, comp.y, comp.x + width, comp.y + height)
+            for group in self.app.groups.values()
+            for comp in group
+        ]
 
+        # Start with each component
+        for i, (c1, c1_left, c1_top, c1_right, c1_bottom) in enumerate(all_bounds):
             # Check against all remaining components (only check forward to avoid duplicate comparisons)
-            for c2 in all_components[i + 1 :]:
-                c2_left = c2.x
-                c2_right = c2_left + self.app.comp_width
-                c2_top = c2.y
-                c2_bottom = c2_top + self.app.comp_height
-
+            for c2, c2_left, c2_top, c2_right, c2_bottom in all_bounds[i + 1 :]:
                 # For top-down coordinates (y increases downward in image coordinates):
                 if c1_left < c2_right and c1_right > c2_left and c1_top < c2_bottom and c1_bottom > c2_top:
                     overlapping_components.add(c1)
@@ -163,6 +161,9 @@ class FileMenu(Menu):
 
     def generate_print_file(self) -> None:
         """Generate a new print file with scaled exposure settings and composite images."""
+        # Imported on use: print file generation pulls in the image processing and graph coloring stack
+        from app.gen_print_file import new_print_file  # noqa: PLC0415
+
         # Check if a component has been loaded
         if not self.app.component_file:
             logger.error("No component file loaded")
@@ -9,6 +9,9 @@ from app.menus.menu import Menu
 if TYPE_CHECKING:
     from app.app import App
 
+# Menu index of the first group radio button, after New Group, Delete Group, a separator, and the header
+GROUP_ENTRY_OFFSET = 4
+
 
 class GroupMenu(Menu):
     """Create and handle the Group menu and its actions.
@@ -33,6 +36,8 @@ class GroupMenu(Menu):
             The Tkinter menubar to which the Group menu is added.
 
         """
+        self._color_box_cache: dict[str, tk.PhotoImage] = {}
+        self._group_entries: list[str] = []
         super().__init__(app, menubar)
         self.current_group = tk.StringVar()
 
@@ -106,6 +111,37 @@ class GroupMenu(Menu):
         msg = "Enter a name for the group. This will be the exposure scale:"
         return simpledialog.askstring(title, msg)
 
+    def _get_color_box(self, color: str) -> tk.PhotoImage:
+        """Return the swatch for a color, creating it on first use.
+
+        Parameters
+        ----------
+        color : str
+            The color of the swatch.
+
+        Returns
+        -------
+        tk.PhotoImage
+            The cached swatch image.
+
+        """
+        # Swatches only depend on the color, so reuse them across groups and rebuilds
+        color_box = self._color_box_cache.get(color)
+        if color_box is None:
+            color_box = self._color_box_cache[color] = self.create_color_box(color)
+        return color_box
+
+    def _prune_color_boxes(self) -> None:
+        """Drop swatches of colors no longer used by any group."""
+        for color in self._color_box_cache.keys() - set(self.app.colors.values()):
+            del self._color_box_cache[color]
+
+    def _group_entry_index(self, group: str) -> int | None:
+        """Return the menu index of a group's radio button, or None if the menu has no entry for it."""
+        if group not in self._group_entries:
+            return None
+        return GROUP_ENTRY_OFFSET + self._group_entries.index(group)
+
     def build_menu(self) -> None:
         """Rebuild the group menu items, showing updated group/color entries."""
         self.menu.delete(0, "end")
@@ -114,13 +150,13 @@ class GroupMenu(Menu):
         self.menu.add_separator()
         self.menu.add_command(label="- Groups -", state=tk.DISABLED)
         self.app.color_boxes.clear()
+        self._group_entries = []
         for group in self.app.groups:
-            color = self.app.colors[group]
-            label = f"  {group}"
-            color_box = self.create_color_box(color)
+            color_box = self._get_color_box(self.app.colors[group])
             self.app.color_boxes[group] = color_box
+            self._group_entries.append(group)
             self.menu.add_radiobutton(
-                label=label,
+                label=f"  {group}",
                 variable=self.current_group,
                 value=group,
                 indicatoron=1,
@@ -136,6 +172,84 @@ class GroupMenu(Menu):
         )
         if self.app.groups:
             self.current_group.set(list(self.app.groups.keys())[-1])
+        self._prune_color_boxes()
+
+    def _add_group_entry(self, group: str) -> None:
+        """Insert a radio button for a new group after the existing group entries.
+
+        Parameters
+        ----------
+        group : str
+            The name of the new group.
+
+        """
+        color_box = self._get_color_box(self.app.colors[group])
+        self.app.color_boxes[group] = color_box
+        self.menu.insert_radiobutton(
+            GROUP_ENTRY_OFFSET + len(self._group_entries),
+            label=f"  {group}",
+            variable=self.current_group,
+            value=group,
+            indicatoron=1,
+            compound=tk.LEFT,
+            image=color_box,
+        )
+        self._group_entries.append(group)
+
+    def _remove_group_entry(self, group: str) -> None:
+        """Remove the radio button of a deleted group, rebuilding the menu if it has no entry for the group.
+
+        Parameters
+        ----------
+        group : str
+            The name of the deleted group.
+
+        """
+        index = self._group_entry_index(group)
+        if index is None:
+            self.build_menu()
+            return
+        self.menu.delete(index)
+        self._group_entries.remove(group)
+        self.app.color_boxes.pop(group, None)
+        self._prune_color_boxes()
+
+    def _rename_group_entry(self, old_name: str, new_name: str) -> None:
+        """Relabel the radio button of a renamed group, rebuilding the menu if it has no entry for the group.
+
+        Parameters
+        ----------
+        old_name : str
+            The previous name of the group.
+        new_name : str
+            The new name of the group.
+
+        """
+        index = self._group_entry_index(old_name)
+        if index is None:
+            self.build_menu()
+            return
+        self.menu.entryconfigure(index, label=f"  {new_name}", value=new_name)
+        self._group_entries[index - GROUP_ENTRY_OFFSET] = new_name
+        self.app.color_boxes[new_name] = self.app.color_boxes.pop(old_name, None)
+
+    def _recolor_group_entry(self, group: str) -> None:
+        """Update the swatch of a group's radio button, rebuilding the menu if it has no entry for the group.
+
+        Parameters
+        ----------
+        group : str
+            The name of the group whose color changed.
+
+        """
+        index = self._group_entry_index(group)
+        if index is None:
+            self.build_menu()
+            return
+        color_box = self._get_color_box(self.app.colors[group])
+        self.app.color_boxes[group] = color_box
+        self.menu.entryconfigure(index, image=color_box)
+        self._prune_color_boxes()
 
     def new_group(self) -> None:
         """Create a new group."""
@@ -152,7 +266,7 @@ class GroupMenu(Menu):
             simpledialog.messagebox.showerror("Error", "Please select a color for the new group.")
             return
         self.app.groups[group_name] = []
-        self.build_menu()
+        self._add_group_entry(group_name)
 
     def delete_group(self) -> None:
         """Delete the currently selected group and its components."""
@@ -168,9 +282,10 @@ class GroupMenu(Menu):
                 comp.delete()
             del self.app.groups[group]
             del self.app.colors[group]
-            self.build_menu()
+            self._remove_group_entry(group)
+            if self.app.groups:
+                self.current_group.set(list(self.app.groups.keys())[-1])
             self.app.deselect_all()
-            self.build_menu()
 
     def rename_group(self) -> None:
         """Rename the currently selected group."""
@@ -185,11 +300,12 @@ class GroupMenu(Menu):
         if not self._validate_group_name(new_name):
             return
 
-        self.app.groups[new_name] = self.app.groups.pop(old_name)
-        self.app.colors[new_name] = self.app.colors.pop(old_name)
+        # Rename in place so the group keeps its position in the menu
+        self.app.groups = {new_name if k == old_name else k: v for k, v in self.app.groups.items()}
+        self.app.colors = {new_name if k == old_name else k: v for k, v in self.app.colors.items()}
         for comp in self.app.groups[new_name]:
             comp.group = new_name
-        self.build_menu()
+        self._rename_group_entry(old_name, new_name)
         self.current_group.set(new_name)
         self.app.update_label(self.app.selection[0])
 
@@ -204,7 +320,9 @@ class GroupMenu(Menu):
         self.app.colors[group] = color
         for comp in self.app.groups.get(group, []):
             comp.set_color(color)
-        self.build_menu()
+        # A group being created has no menu entry yet, new_group adds it afterwards
+        if group in self.app.groups:
+            self._recolor_group_entry(group)
 
     def change_group(self) -> None:
         """Change the group of the selected components to the current group."""
@@ -1,13 +1,31 @@
 """App methods in the View menu."""
 
 import tkinter as tk
+from typing import TYPE_CHECKING
 
 from app.menus.menu import Menu
 
+if TYPE_CHECKING:
+    from app.app import App
+
 
 class ViewMenu(Menu):
     """Create and handle the View menu and its actions."""
 
+    def __init__(self, app: "App", menubar: tk.Menu) -> None:
+        """Initialize the ViewMenu class.
+
+        Parameters
+        ----------
+        app : App
+            The application instance.
+        menubar : tk.Menu
+            The Tkinter menubar to which the View menu is added.
+
+        """
+        self._redraw_pending = False
+        super().__init__(app, menubar)
+
     def _create_menu(self, menubar: tk.Menu) -> None:
         """Create the view menu items."""
         menubar.add_cascade(label="View", menu=self.menu)
@@ -19,12 +37,28 @@ class ViewMenu(Menu):
         self.app.root.bind_all("<Control-equal>", lambda _: self.zoom_in())
         self.app.root.bind_all("<Control-minus>", lambda _: self.zoom_out())
 
+    def _schedule_redraw(self) -> None:
+        """Redraw the canvas once the event queue is idle.
+
+        Holding a zoom shortcut repeats it faster than the canvas can be redrawn, so the zoom steps queued up in
+        between are applied with a single redraw at the final zoom level.
+        """
+        if self._redraw_pending:
+            return
+        self._redraw_pending = True
+        self.app.root.after_idle(self._flush_redraw)
+
+    def _flush_redraw(self) -> None:
+        """Redraw the canvas at the current zoom level."""
+        self._redraw_pending = False
+        self.app.redraw_canvas()
+
     def zoom_in(self) -> None:
         """Increase zoom by 10%."""
-        self.app.zoom_factor = getattr(self.app, "zoom_factor", 1.0) + 0.1
-        self.app.redraw_canvas()
+        self.app.zoom_factor += 0.1
+        self._schedule_redraw()
 
     def zoom_out(self) -> None:
         """Decrease zoom by 10%."""
-        self.app.zoom_factor = max(0.1, getattr(self.app, "zoom_factor", 1.0) - 0.1)
-        self.app.redraw_canvas()
+        self.app.zoom_factor = max(0.1, self.app.zoom_factor - 0.1)
+        self._schedule_redraw()
@@ -31,7 +31,8 @@ class Popup:
         tk.Label(self.popup, text=message, padx=20, pady=10).pack()
         self.popup.transient(parent)
         self.popup.grab_set()
-        parent.update()
+        # Only draw the popup; a full update() would also run queued user events and callbacks before the work starts
+        parent.update_idletasks()
 
     def destroy(self) -> None:
         """Close the popup."""
@@ -1,18 +1,43 @@
 """Shared utilities for loading and saving print files."""
 
+import contextlib
 import io
 import json
 import logging
+import os
+import re
+import time
 import zipfile
+from collections import deque
+from collections.abc import Iterable, Iterator, Mapping, MutableMapping
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from types import TracebackType
 from typing import Any
 
 from PIL import Image
 
 from app.constants import CANVAS_HEIGHT, CANVAS_WIDTH
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; without it the standard library parses print settings, slower
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# A run of digits long enough to be an integer beyond 64 bits, which orjson would silently read as a float
+LONG_DIGIT_RUN = re.compile(rb"\d{20}")
+
+# zlib level used to encode images when saving print files, the same as Pillow's default
+PNG_COMPRESS_LEVEL = 6
+
+# Signature at the start of every PNG file
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Number of images per encoding thread that may be queued ahead of the one being written to the zip
+ENCODE_QUEUE_DEPTH = 2
+
 
 def ensure_default_image(print_settings: dict[str, Any], images: dict[str, Image.Image]) -> None:
     """Ensure print settings has a valid default image by adding a black image if needed.
@@ -47,18 +72,194 @@ def collect_referenced_images(print_settings: dict[str, Any]) -> set[str]:
         Set of all referenced image filenames.
 
     """
-    referenced_images = set()
+    referenced_images = _layer_images(print_settings)
     # Keep default image if it exists
     if "Default layer settings" in print_settings and "Image settings" in print_settings["Default layer settings"]:
         referenced_images.add(print_settings["Default layer settings"]["Image settings"]["Image file"])
-
-    # Get images for each layer
-    for layer in print_settings.get("Layers", []):
-        for img_setting in layer.get("Image settings list", []):
-            referenced_images.add(img_setting["Image file"])
     return referenced_images
 
 
+def _layer_images(print_settings: dict[str, Any]) -> set[str]:
+    """Return the names of the images used by the layers, walking the layers once."""
+    return {
+        img_setting["Image file"]
+        for layer in print_settings.get("Layers", [])
+        for img_setting in layer.get("Image settings list", [])
+    }
+
+
+class LazyImageStore(MutableMapping[str, Image.Image]):
+    """Images of an open print file, decoded from its zip only when accessed.
+
+    Images from the zip are decoded on every access rather than kept, so only the images a caller is currently
+    holding are in memory. Images assigned to the store are kept in memory and take precedence over the zip.
+    The store must be closed, or used as a context manager, to release the zip file.
+    """
+
+    def __init__(self, zf: zipfile.ZipFile, names: Iterable[str]) -> None:
+        """Initialize the store.
+
+        Parameters
+        ----------
+        zf : zipfile.ZipFile
+            The open print file, with images in its ``slices`` folder.
+        names : Iterable[str]
+            The names of the images in the zip to expose.
+
+        """
+        self._zf = zf
+        self._names = dict.fromkeys(names)
+        self._assigned: dict[str, Image.Image] = {}
+
+    def __getitem__(self, name: str) -> Image.Image:
+        """Return the image with the given name, decoding it from the zip if it was not assigned."""
+        if name in self._assigned:
+            return self._assigned[name]
+        if name not in self._names:
+            raise KeyError(name)
+        with self._zf.open(f"slices/{name}") as f:
+            logger.debug("Loading image: %s", name)
+            return Image.open(f).convert("L")
+
+    def __setitem__(self, name: str, img: Image.Image) -> None:
+        """Add or replace an image, keeping it in memory."""
+        self._names[name] = None
+        self._assigned[name] = img
+
+    def __delitem__(self, name: str) -> None:
+        """Remove an image from the store."""
+        del self._names[name]
+        self._assigned.pop(name, None)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the image names."""
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        """Return the number of images."""
+        return len(self._names)
+
+    def __contains__(self, name: object) -> bool:
+        """Return whether an image with the given name is in the store, without decoding it."""
+        return name in self._names
+
+    def __enter__(self) -> "LazyImageStore":  # noqa: PYI034
+        """Return the store for use as a context manager."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the zip file."""
+        self.close()
+
+    def copy(self) -> "LazyImageStore":
+        """Return a shallow copy that shares the zip file, so assignments to the copy do not affect this store."""
+        store = LazyImageStore(self._zf, self._names)
+        store._assigned = dict(self._assigned)
+        return store
+
+    def png_bytes(self, name: str) -> bytes | None:
+        """Return the PNG data of an image as read from the zip, if saving it again would not change it.
+
+        That is the case for images not assigned to the store whose PNG holds 8-bit grayscale pixels, which
+        decode to exactly the image this store returns. Saving such an image can copy this data instead of
+        decoding and encoding it again.
+
+        Parameters
+        ----------
+        name : str
+            The name of the image.
+
+        Returns
+        -------
+        bytes | None
+            The PNG data, or None if the image was assigned or is stored in another format.
+
+        """
+        if name in self._assigned or name not in self._names:
+            return None
+        data = self._zf.read(f"slices/{name}")
+
+        # IHDR is always the first chunk; its bit depth and color type bytes follow the width and height
+        if data[:8] == PNG_SIGNATURE and data[12:16] == b"IHDR" and data[24] == 8 and data[25] == 0:  # noqa: PLR2004
+            return data
+        return None
+
+    def close(self) -> None:
+        """Close the zip file."""
+        self._zf.close()
+
+
+def _read_print_settings(zf: zipfile.ZipFile) -> tuple[dict[str, Any], set[str]]:
+    """Read the print settings from an open print file, with the names of the images its layers use."""
+    logger.debug("Reading print_settings.json from zip")
+    data = zf.read("print_settings.json")
+    print_settings = None
+    if orjson is not None and not LONG_DIGIT_RUN.search(data):
+        # orjson rejects some JSON the standard library accepts, such as NaN and Infinity
+        with contextlib.suppress(orjson.JSONDecodeError):
+            print_settings = orjson.loads(data)
+    if print_settings is None:
+        print_settings = json.loads(data)
+
+    # Collect unique image names to avoid reloading same file every time it is referenced
+    return print_settings, _layer_images(print_settings)
+
+
+def _check_input_path(input_path: Path) -> None:
+    """Raise ValueError if the path is not a zip file."""
+    if input_path.suffix.lower() != ".zip":
+        msg = "Input path must be a .zip file."
+        logger.error(msg)
+        raise ValueError(msg)
+
+
+def open_print_file(input_path: Path) -> tuple[dict[str, Any], LazyImageStore]:
+    """Open a print file, reading its settings now and its images only when they are used.
+
+    Parameters
+    ----------
+    input_path : Path
+        Path to input zip file containing print settings and images.
+
+    Returns
+    -------
+    tuple[dict[str, Any], LazyImageStore]
+        Tuple containing:
+        - Dictionary with print settings
+        - Store of the images used by the layers, which must be closed when done
+
+    """
+    logger.info("Opening print file %s", input_path)
+    _check_input_path(input_path)
+
+    zf = zipfile.ZipFile(input_path, "r")
+    try:
+        print_settings, unique_images = _read_print_settings(zf)
+
+        # Fail now, as load_print_file would, rather than part way through processing
+        available = set(zf.namelist())
+        missing = sorted(name for name in unique_images if f"slices/{name}" not in available)
+        if missing:
+            msg = f"Images missing from print file: {', '.join(missing)}"
+            logger.error(msg)
+            raise KeyError(msg)
+    except:
+        zf.close()
+        raise
+
+    logger.info(
+        "Print file opened successfully: %d layers, %d images",
+        len(print_settings.get("Layers", [])),
+        len(unique_images),
+    )
+    return print_settings, LazyImageStore(zf, unique_images)
+
+
 def load_print_file(input_path: Path) -> tuple[dict[str, Any], dict[str, Image.Image]]:
     """Load print settings and images from a zip file.
 
@@ -76,22 +277,11 @@ def load_print_file(input_path: Path) -> tuple[dict[str, Any], dict[str, Image.I
 
     """
     logger.info("Loading print file from %s", input_path)
-    if input_path.suffix.lower() != ".zip":
-        msg = "Input path must be a .zip file."
-        logger.error(msg)
-        raise ValueError(msg)
+    _check_input_path(input_path)
 
     images: dict[str, Image.Image] = {}
     with zipfile.ZipFile(input_path, "r") as zf:
-        logger.debug("Reading print_settings.json from zip")
-        with zf.open("print_settings.json") as f:
-            print_settings = json.load(f)
-
-        # Collect unique image names to avoid reloading same file every time it is referenced
-        unique_images = set()
-        for layer in print_settings.get("Layers", []):
-            for img_setting in layer.get("Image settings list", []):
-                unique_images.add(img_setting["Image file"])
+        print_settings, unique_images = _read_print_settings(zf)
 
         logger.info("Loading %d unique images", len(unique_images))
 
@@ -113,24 +303,111 @@ def load_print_file(input_path: Path) -> tuple[dict[str, Any], dict[str, Image.I
     return print_settings, images
 
 
-def save_print_file(output_path: Path, print_settings: dict[str, Any], images: dict[str, Image.Image]) -> None:
-    """Save print settings and images to a zip file."""
+def _slice_info(img_name: str) -> zipfile.ZipInfo:
+    """Return the zip entry for an image, stored as is since PNG data is already deflated."""
+    info = zipfile.ZipInfo(f"slices/{img_name}", date_time=time.localtime()[:6])
+    info.compress_type = zipfile.ZIP_STORED
+    info.external_attr = 0o600 << 16  # The same permissions writestr gives entries it names itself
+    return info
+
+
+def _encode_png(img: Image.Image, compress_level: int) -> memoryview:
+    """Encode an image as PNG, returning a view of the encoded bytes rather than a copy."""
+    img_bytes = io.BytesIO()
+    img.save(img_bytes, format="PNG", compress_level=compress_level)
+    return img_bytes.getbuffer()
+
+
+def _encode_pngs(
+    items: Iterable[tuple[str, Image.Image]],
+    compress_level: int,
+    workers: int,
+) -> Iterator[tuple[str, memoryview]]:
+    """Encode images as PNG on a pool of threads, yielding them in order.
+
+    Pillow releases the GIL while it compresses, so threads encode in parallel without copying images to other
+    processes. Only a few images per thread are queued at once, so a generator of images is still consumed a few
+    images at a time.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending: deque[tuple[str, Future[memoryview]]] = deque()
+        for img_name, img in items:
+            pending.append((img_name, executor.submit(_encode_png, img, compress_level)))
+            if len(pending) >= ENCODE_QUEUE_DEPTH * workers:
+                done_name, future = pending.popleft()
+                yield done_name, future.result()
+        while pending:
+            done_name, future = pending.popleft()
+            yield done_name, future.result()
+
+
+def _copy_encoded_images(zf: zipfile.ZipFile, images: LazyImageStore) -> set[str]:
+    """Write the images whose PNG data can be reused as is into a zip, returning their names."""
+    copied = set()
+    for img_name in images:
+        png_bytes = images.png_bytes(img_name)
+        if png_bytes is not None:
+            logger.debug("Copying image: %s", img_name)
+            zf.writestr(_slice_info(img_name), png_bytes)
+            copied.add(img_name)
+    return copied
+
+
+def save_print_file(
+    output_path: Path,
+    print_settings: dict[str, Any],
+    images: Mapping[str, Image.Image] | Iterable[tuple[str, Image.Image]],
+    *,
+    compress_level: int = PNG_COMPRESS_LEVEL,
+) -> None:
+    """Save print settings and images to a zip file.
+
+    Parameters
+    ----------
+    output_path : Path
+        Path to the output zip file.
+    print_settings : dict[str, Any]
+        The print settings dictionary.
+    images : Mapping[str, Image.Image] | Iterable[tuple[str, Image.Image]]
+        Images to save, by filename. An iterable of (filename, image) pairs, such as a generator, is consumed
+        one image at a time, so the images never all need to be held in memory. Images of a LazyImageStore
+        that are unchanged from its zip are copied without being decoded and encoded again.
+    compress_level : int, optional
+        zlib level, 0-9, used to encode the PNG images, by default PNG_COMPRESS_LEVEL. Lower levels encode
+        several times faster at the cost of larger files. Copied images keep their original encoding.
+
+    """
     logger.info("Saving print file to %s", output_path)
 
     with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        # Save print settings
+        # Save print settings with the standard library, since orjson writes NaN, non-ASCII text, and non-string
+        # keys differently
         logger.debug("Writing print_settings.json")
         zf.writestr("print_settings.json", json.dumps(print_settings, indent=2))
 
         # Create slices directory in zip
         zf.writestr("slices/", "")
 
-        # Save all images
-        logger.info("Saving %d images", len(images))
-        for img_name, img in images.items():
-            logger.debug("Saving image: %s", img_name)
-            img_bytes = io.BytesIO()
-            img.save(img_bytes, format="PNG")
-            zf.writestr(f"slices/{img_name}", img_bytes.getvalue())
+        # Save all images, copying those a store can provide already encoded
+        items = images.items() if isinstance(images, Mapping) else images
+        count = 0
+        if isinstance(images, LazyImageStore):
+            copied = _copy_encoded_images(zf, images)
+            items = ((img_name, images[img_name]) for img_name in images if img_name not in copied)
+            count += len(copied)
+        workers = os.cpu_count() or 1
+        if workers == 1:
+            # Encode each image straight into its zip entry, without an intermediate buffer
+            for img_name, img in items:
+                logger.debug("Saving image: %s", img_name)
+                with zf.open(_slice_info(img_name), "w") as dest:
+                    img.save(dest, format="PNG", compress_level=compress_level)
+                count += 1
+        else:
+            for img_name, png_bytes in _encode_pngs(items, compress_level, workers):
+                logger.debug("Saving image: %s", img_name)
+                zf.writestr(_slice_info(img_name), png_bytes)
+                count += 1
+        logger.info("Saved %d images", count)
 
     logger.info("Print file saved successfully")
@@ -0,0 +1,100 @@
+"""Ordered set of selected components."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from app.component import Component
+
+
+class Selection:
+    """The selected components, in the order they were selected.
+
+    Supports the list operations used on a selection (append, remove, clear, indexing, iteration) plus a set-like
+    discard, but is backed by an insertion-ordered dict so membership tests, appends, and removals are O(1) instead
+    of O(N).
+
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty selection."""
+        self._items: dict[Component, None] = {}
+
+    def __len__(self) -> int:
+        """Return the number of selected components."""
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Component]:
+        """Iterate over the selected components in selection order."""
+        return iter(self._items)
+
+    def __contains__(self, comp: object) -> bool:
+        """Return whether the component is selected."""
+        return comp in self._items
+
+    def __getitem__(self, index: int | slice) -> Component | list[Component]:
+        """Return the component at a position in selection order."""
+        if index == 0 and self._items:
+            return next(iter(self._items))
+        return list(self._items)[index]
+
+    def __eq__(self, other: object) -> bool:
+        """Compare in selection order with another selection or a list of components."""
+        if isinstance(other, (Selection, list)):
+            return list(self._items) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        """Return a representation listing the selected components."""
+        return f"Selection({list(self._items)!r})"
+
+    def append(self, comp: Component) -> None:
+        """Add a component to the end of the selection, if not already selected.
+
+        Parameters
+        ----------
+        comp : Component
+            The component to select.
+
+        """
+        self._items[comp] = None
+
+    def remove(self, comp: Component) -> None:
+        """Remove a component from the selection.
+
+        Parameters
+        ----------
+        comp : Component
+            The component to deselect.
+
+        Raises
+        ------
+        ValueError
+            If the component is not selected.
+
+        """
+        try:
+            del self._items[comp]
+        except KeyError:
+            msg = "Component is not selected."
+            raise ValueError(msg) from None
+
+    def discard(self, comp: Component) -> None:
+        """Remove a component from the selection, if selected.
+
+        Parameters
+        ----------
+        comp : Component
+            The component to deselect.
+
+        """
+        self._items.pop(comp, None)
+
+    def clear(self) -> None:
+        """Remove all components from the selection."""
+        self._items.clear()
@@ -0,0 +1,230 @@
+"""Uniform grid spatial index for fast area queries over components."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from app.component import Component
+
+# Side length, in unscaled canvas pixels, of one grid cell
+CELL_SIZE = 128
+
+# Number of component slots allocated up front; the arrays double in size when full
+INITIAL_CAPACITY = 64
+
+
+class SpatialIndex:
+    """Bucket components by the grid cell containing their top-left corner.
+
+    All components share the same width and height, so only their origins need to be indexed: a component lies
+    fully inside a rectangle exactly when its origin lies inside that rectangle shrunk by the component size.
+
+    Origins are stored as parallel NumPy arrays indexed by slot, so the exact containment test on the candidates
+    from the grid buckets runs as a handful of vector comparisons instead of a Python loop.
+
+    Attributes
+    ----------
+    cell_size : int
+        The side length of a grid cell.
+
+    """
+
+    def __init__(self, cell_size: int = CELL_SIZE) -> None:
+        """Initialize an empty index.
+
+        Parameters
+        ----------
+        cell_size : int, optional
+            The side length of a grid cell, by default CELL_SIZE.
+
+        """
+        self.cell_size = cell_size
+        self._cells: dict[tuple[int, int], dict[int, None]] = defaultdict(dict)
+        self._slot_of: dict[Component, int] = {}
+        self._cell_of: list[tuple[int, int]] = []
+        self._xs = np.empty(INITIAL_CAPACITY, dtype=np.int64)
+        self._ys = np.empty(INITIAL_CAPACITY, dtype=np.int64)
+        self._refs = np.empty(INITIAL_CAPACITY, dtype=object)
+
+        # Scratch buffers reused by every query, so repeated queries during a drag do not allocate
+        self._slot_buf = np.empty(INITIAL_CAPACITY, dtype=np.intp)
+        self._coord_buf = np.empty(INITIAL_CAPACITY, dtype=np.int64)
+        self._mask_buf = np.empty(INITIAL_CAPACITY, dtype=np.bool_)
+        self._tmp_mask_buf = np.empty(INITIAL_CAPACITY, dtype=np.bool_)
+
+    def __len__(self) -> int:
+        """Return the number of indexed components."""
+        return len(self._slot_of)
+
+    def __iter__(self) -> Iterator[Component]:
+        """Iterate over all indexed components."""
+        return iter(self._refs[: len(self)].tolist())
+
+    def _cell(self, x: float, y: float) -> tuple[int, int]:
+        """Return the grid cell containing the point (x, y)."""
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def _grow(self) -> None:
+        """Double the capacity of the coordinate arrays and scratch buffers."""
+        capacity = 2 * len(self._refs)
+        for name in ("_xs", "_ys", "_refs"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+        for name in ("_slot_buf", "_coord_buf", "_mask_buf", "_tmp_mask_buf"):
+            setattr(self, name, np.empty(capacity, dtype=getattr(self, name).dtype))
+
+    def _place(self, slot: int, comp: Component) -> None:
+        """Store a component's position in a slot and add the slot to its grid bucket."""
+        cell = self._cell(comp.x, comp.y)
+        self._xs[slot] = comp.x
+        self._ys[slot] = comp.y
+        self._refs[slot] = comp
+        self._cells[cell][slot] = None
+        if slot == len(self._cell_of):
+            self._cell_of.append(cell)
+        else:
+            self._cell_of[slot] = cell
+
+    def _unbucket(self, slot: int) -> None:
+        """Remove a slot from its grid bucket."""
+        cell = self._cell_of[slot]
+        bucket = self._cells[cell]
+        del bucket[slot]
+        if not bucket:
+            del self._cells[cell]
+
+    def insert(self, comp: Component) -> None:
+        """Add a component to the index at its current position.
+
+        Parameters
+        ----------
+        comp : Component
+            The component to add.
+
+        """
+        slot = len(self)
+        if slot == len(self._refs):
+            self._grow()
+        self._slot_of[comp] = slot
+        self._place(slot, comp)
+
+    def remove(self, comp: Component) -> None:
+        """Remove a component from the index, if present.
+
+        The last slot is moved into the freed one so the arrays stay densely packed.
+
+        Parameters
+        ----------
+        comp : Component
+            The component to remove.
+
+        """
+        slot = self._slot_of.pop(comp, None)
+        if slot is None:
+            return
+        self._unbucket(slot)
+        last = len(self)
+        if slot != last:
+            moved = self._refs[last]
+            self._unbucket(last)
+            self._slot_of[moved] = slot
+            self._place(slot, moved)
+        self._refs[last] = None
+        self._cell_of.pop()
+
+    def move(self, comp: Component) -> None:
+        """Update the index after a component has changed position.
+
+        Parameters
+        ----------
+        comp : Component
+            The component that moved.
+
+        """
+        slot = self._slot_of.get(comp)
+        if slot is None:
+            return
+        self._xs[slot] = comp.x
+        self._ys[slot] = comp.y
+        cell = self._cell(comp.x, comp.y)
+        if self._cell_of[slot] != cell:
+            self._unbucket(slot)
+            self._cells[cell][slot] = None
+            self._cell_of[slot] = cell
+
+    def clear(self) -> None:
+        """Remove all components from the index."""
+        self._refs[: len(self)] = None
+        self._cells.clear()
+        self._slot_of.clear()
+        self._cell_of.clear()
+
+    def query(self, x_min: float, y_min: float, x_max: float, y_max: float) -> list[Component]:
+        """Return the components whose origin lies within the given rectangle, bounds inclusive.
+
+        Parameters
+        ----------
+        x_min : float
+            The left edge of the rectangle.
+        y_min : float
+            The top edge of the rectangle.
+        x_max : float
+            The right edge of the rectangle.
+        y_max : float
+            The bottom edge of the rectangle.
+
+        Returns
+        -------
+        list[Component]
+            Each component whose origin is inside the rectangle.
+
+        """
+        if x_max < x_min or y_max < y_min:
+            return []
+        cell_x1, cell_y1 = self._cell(x_min, y_min)
+        cell_x2, cell_y2 = self._cell(x_max, y_max)
+        cells = self._cells
+
+        # Cells strictly inside the rectangle on both axes hold only matches, so just the border cells need testing
+        inner: list[int] = []
+        border: list[int] = []
+        for cell_x in range(cell_x1, cell_x2 + 1):
+            x_inner = cell_x1 < cell_x < cell_x2
+            for cell_y in range(cell_y1, cell_y2 + 1):
+                bucket = cells.get((cell_x, cell_y))
+                if not bucket:
+                    continue
+                if x_inner and cell_y1 < cell_y < cell_y2:
+                    inner.extend(bucket)
+                else:
+                    border.extend(bucket)
+        found = self._refs[inner].tolist() if inner else []
+        if not border:
+            return found
+
+        # Evaluate the containment test in place in the preallocated buffers
+        count = len(border)
+        slots = self._slot_buf[:count]
+        slots[:] = border
+        coords = self._coord_buf[:count]
+        mask = self._mask_buf[:count]
+        tmp = self._tmp_mask_buf[:count]
+        np.take(self._xs, slots, out=coords)
+        np.greater_equal(coords, x_min, out=mask)
+        np.less_equal(coords, x_max, out=tmp)
+        mask &= tmp
+        np.take(self._ys, slots, out=coords)
+        np.greater_equal(coords, y_min, out=tmp)
+        mask &= tmp
+        np.less_equal(coords, y_max, out=tmp)
+        mask &= tmp
+        found.extend(self._refs[slots[mask]].tolist())
+        return found
@@ -2,16 +2,21 @@
 # ruff: noqa: S311
 
 import colorsys
+import functools
 import logging
 import random
 from pathlib import Path
 
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
-from graph_coloring import check_overlap, partition_images
+from graph_coloring import partition_images
 
 logger = logging.getLogger(__name__)
 
+# Lookup table for Image.point that turns any lit pixel into a fully opaque mask pixel
+MASK_LUT = [0] + [255] * 255
+
 
 def generate_test_images(
     count: int = 30,
@@ -68,9 +73,12 @@ def visualize_image_partitioning(
     # Generate distinct colors for each group
     group_colors = _get_distinct_colors(len(groups))
 
+    # Threshold each image once for both the group and overlay visualizations
+    masks = {filename: img.point(MASK_LUT) for filename, img in images.items()}
+
     # Create and save visualizations
-    _create_group_visualizations(images, groups, group_colors, output_dir)
-    _create_overlay_composite(images, groups, group_colors, output_dir)
+    _create_group_visualizations(masks, groups, group_colors, output_dir)
+    _create_overlay_composite(masks, groups, group_colors, output_dir)
     _create_master_composite(groups, output_dir)
 
 
@@ -92,8 +100,17 @@ def _get_distinct_colors(n: int) -> list[tuple[int, int, int]]:
     return colors
 
 
+@functools.lru_cache(maxsize=4)
+def _load_font(name: str, size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """Load a TrueType font once, falling back to Pillow's default font if it is not installed."""
+    try:
+        return ImageFont.truetype(name, size)
+    except OSError:
+        return ImageFont.load_default()
+
+
 def _create_group_visualizations(
-    images: dict[str, Image.Image],
+    masks: dict[str, Image.Image],
     groups: dict[int, list[str]],
     group_colors: list[tuple[int, int, int]],
     output_dir: str,
@@ -107,22 +124,14 @@ def _create_group_visualizations(
         composite = Image.new("RGB", (2560, 1600), (0, 0, 0))
         draw = ImageDraw.Draw(composite)
 
-        # Add each image to the composite with a colored border
+        # Add each image to the composite, using its mask to colorize it
         for filename in filenames:
-            # Convert to RGB and colorize
-            img = images[filename].convert("RGB")
-            colored_img = Image.new("RGB", img.size, color_rgb)
-
-            # Use the original image as a mask
-            mask = images[filename].point(lambda p: p > 0 and 255)
+            mask = masks[filename]
+            colored_img = Image.new("RGB", mask.size, color_rgb)
             composite.paste(colored_img, (0, 0), mask)
 
         # Add text label for the group
-        try:
-            font = ImageFont.truetype("arial.ttf", 40)
-        except OSError:
-            font = ImageFont.load_default()
-
+        font = _load_font("arial.ttf", 40)
         draw.text((50, 50), f"Group {group_id}: {len(filenames)} images", fill=(255, 255, 255), font=font)
 
         # Save the composite
@@ -132,7 +141,7 @@ def _create_group_visualizations(
 
 
 def _create_overlay_composite(
-    images: dict[str, Image.Image],
+    masks: dict[str, Image.Image],
     groups: dict[int, list[str]],
     group_colors: list[tuple[int, int, int]],
     output_dir: str,
@@ -145,15 +154,12 @@ def _create_overlay_composite(
     for i, (_, filenames) in enumerate(groups.items()):
         color_rgb = group_colors[i]
         for filename in filenames:
-            colored_img = Image.new("RGB", images[filename].size, color_rgb)
-            mask = images[filename].point(lambda p: p > 0 and 255)
+            mask = masks[filename]
+            colored_img = Image.new("RGB", mask.size, color_rgb)
             overlay_composite.paste(colored_img, (0, 0), mask)
 
     # Add legend to the overlay composite
-    try:
-        font = ImageFont.truetype("arial.ttf", 40)
-    except OSError:
-        font = ImageFont.load_default()
+    font = _load_font("arial.ttf", 40)
 
     overlay_draw.text(
         (50, 50),
@@ -241,13 +247,14 @@ def test_image_partitioning() -> None:
     for group_id, filenames in groups.items():
         logger.info("Group %d: %d images", group_id, len(filenames))
 
-    # Verify no overlaps within groups
+    # Verify no overlaps within groups, packing each image's lit pixels into bits once rather than once per pair
+    packed = {filename: np.packbits(np.asarray(img) > 0) for filename, img in images.items()}
     errors = 0
     for group_id, filenames in groups.items():
         for i, img1_name in enumerate(filenames):
             for j in range(i + 1, len(filenames)):
                 img2_name = filenames[j]
-                if check_overlap(images[img1_name], images[img2_name]):
+                if np.bitwise_and(packed[img1_name], packed[img2_name]).any():
                     logger.error("Overlap detected in group %d between %s and %s", group_id, img1_name, img2_name)
                     errors += 1
 
@@ -1,11 +1,11 @@
 """Test suite for main application."""
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, call, patch
 
 import pytest
 
-from app.app import App
-from app.component import Component
+from app.app import FRAME_INTERVAL_MS, App
+from app.component import COMPONENT_TAG, SELECTED_TAG, Component
 from app.constants import CANVAS_HEIGHT, CANVAS_WIDTH
 
 
@@ -143,6 +143,26 @@ def test_canvas_zoom(app: App) -> None:
     assert app.canvas.winfo_height() == CANVAS_HEIGHT
 
 
+def test_repeated_zoom_redraws_once(app: App) -> None:
+    """Test that zoom steps queued before the event loop is idle are applied with one redraw."""
+    app.root.after_idle.reset_mock()
+    with patch.object(app, "redraw_canvas") as mock_redraw:
+        for _ in range(3):
+            app.view_menu.zoom_in()
+        app.view_menu.zoom_out()
+
+        app.root.after_idle.assert_called_once()
+        mock_redraw.assert_not_called()
+        app.root.after_idle.call_args.args[0]()
+        mock_redraw.assert_called_once()
+
+    assert app.zoom_factor == pytest.approx(1.2)
+
+    # Zooming again after the redraw schedules a new one
+    app.view_menu.zoom_in()
+    assert app.root.after_idle.call_count == 2
+
+
 def test_component_dragging(app: App) -> None:
     """Test component drag behavior."""
     # Setup test component
@@ -160,13 +180,110 @@ def test_component_dragging(app: App) -> None:
     comp.start_x = 50
     comp.start_y = 50
 
-    # Perform drag
+    # Perform drag, which moves the component on the next frame
+    app.root.after.reset_mock()
     comp.on_drag(event)
+    assert comp.x == 50
+    app.root.after.assert_called_once_with(FRAME_INTERVAL_MS, comp._flush_drag)  # noqa: SLF001
+    app.canvas.coords.reset_mock()
+    comp._flush_drag()  # noqa: SLF001
 
     # Check new position (accounting for zoom factor)
     assert comp.x == 60
     assert comp.y == 60
 
+    # The selected items are translated together rather than given new coordinates
+    app.canvas.move.assert_called_once_with(SELECTED_TAG, 10, 10)
+    app.canvas.coords.assert_not_called()
+
+
+def test_component_drag_coalesced(app: App) -> None:
+    """Test that motion events between frames move the selection once, to the latest pointer position."""
+    app.groups["1.0"] = []
+    app.colors["1.0"] = "#FF0000"
+    comp = Component(app, 50, 50, "1.0")
+    comp.select()
+    comp.start_x = 50
+    comp.start_y = 50
+
+    app.root.after.reset_mock()
+    app.canvas.move.reset_mock()
+    event = MagicMock()
+    for pos in (55, 60, 70):
+        event.x = pos
+        event.y = pos
+        comp.on_drag(event)
+    app.root.after.assert_called_once()
+    app.canvas.move.assert_not_called()
+
+    # Releasing before the frame applies the pending motion at once
+    comp.on_release(event)
+    app.canvas.move.assert_called_once_with(SELECTED_TAG, 20, 20)
+    assert (comp.x, comp.y) == (70, 70)
+    assert comp.start_x is None
+
+
+def test_component_drag_moves_whole_selection(app: App) -> None:
+    """Test that dragging moves every selected component, and only those, by the same offset."""
+    app.groups["1.0"] = []
+    app.colors["1.0"] = "#FF0000"
+    dragged = Component(app, 50, 50, "1.0")
+    other = Component(app, 300, 100, "1.0")
+    unselected = Component(app, 500, 500, "1.0")
+    dragged.select()
+    other.select()
+    app.canvas.itemconfig.assert_called_with(other.comp, outline="red", width=3, tags=(COMPONENT_TAG, SELECTED_TAG))
+
+    app.zoom_factor = 2.0
+    dragged.start_x = 100
+    dragged.start_y = 100
+    event = MagicMock()
+    event.x = 110
+    event.y = 90
+    app.canvas.move.reset_mock()
+    dragged.on_drag(event)
+    dragged._flush_drag()  # noqa: SLF001
+
+    assert (dragged.x, dragged.y) == (55, 45)
+    assert (other.x, other.y) == (305, 95)
+    assert (unselected.x, unselected.y) == (500, 500)
+    app.canvas.move.assert_called_once_with(SELECTED_TAG, 10.0, -10.0)
+    assert list(app.spatial_index.query(300, 90, 310, 100)) == [other]
+
+    other.deselect()
+    app.canvas.itemconfig.assert_called_with(other.comp, outline="", width=0, tags=COMPONENT_TAG)
+
+
+def test_component_uses_slots(app: App) -> None:
+    """Test that components keep their attributes in slots rather than a per-instance dict."""
+    app.colors["1.0"] = "#FF0000"
+    comp = Component(app, 50, 50, "1.0")
+    assert not hasattr(comp, "__dict__")
+    with pytest.raises(AttributeError):
+        comp.selected = True
+
+
+def test_component_skips_unchanged_canvas_updates(app: App) -> None:
+    """Test that repeating a color, group, selection, or deselection sends nothing more to the canvas."""
+    app.colors["1.0"] = "#FF0000"
+    comp = Component(app, 50, 50, "1.0")
+    app.canvas.itemconfig.reset_mock()
+
+    comp.set_color("blue")
+    comp.set_group("1.0")
+    comp.set_group("1.0")
+    comp.select()
+    comp.select()
+    comp.deselect()
+    comp.deselect()
+
+    assert app.canvas.itemconfig.call_args_list == [
+        call(comp.comp, fill="#FF0000"),
+        call(comp.comp, outline="red", width=3, tags=(COMPONENT_TAG, SELECTED_TAG)),
+        call(comp.comp, outline="", width=0, tags=COMPONENT_TAG),
+    ]
+    assert comp not in app.selection
+
 
 def test_select_components_in_area(app: App) -> None:
     """Test area selection of components."""
@@ -180,15 +297,17 @@ def test_select_components_in_area(app: App) -> None:
     comp2 = Component(app, 300, 300, "1.0")  # Outside selection area
     app.groups["1.0"].append(comp2)
 
-    # Mock the component selection
-    def mock_select() -> None:
-        if comp1 not in app.selection:
-            app.selection.append(comp1)
-
-    comp1.select = mock_select
-
-    # Select area that includes comp1 but not comp2
-    app.select_components_in_area(0, 0, 200, 200)
+    # Drag-select an area that includes comp1 but not comp2
+    app.canvas.canvasx.side_effect = lambda v: v
+    app.canvas.canvasy.side_effect = lambda v: v
+    event = MagicMock()
+    event.x = 0
+    event.y = 0
+    app.on_canvas_click(event)
+    event.x = 200
+    event.y = 200
+    app.on_canvas_drag(event)
+    app.on_canvas_release(event)
 
     assert comp1 in app.selection
     assert comp2 not in app.selection
@@ -227,3 +346,217 @@ def test_update_label(app: App) -> None:
     app.dimensions_label.cget.return_value = ""
     app.update_label(None)
     assert app.dimensions_label.cget("text") == ""
+
+
+def test_canvas_drag_coalesces_rectangle_updates(app: App) -> None:
+    """Test that repeated drag events move the selection rectangle once per frame."""
+    app.canvas.canvasx.side_effect = lambda v: v
+    app.canvas.canvasy.side_effect = lambda v: v
+    app.canvas.create_rectangle.reset_mock()
+
+    event = MagicMock()
+    event.x = 0
+    event.y = 0
+    app.on_canvas_click(event)
+    for pos in (10, 20, 30):
+        event.x = pos
+        event.y = pos
+        app.on_canvas_drag(event)
+
+    # Click creates the hidden rectangle, drags only schedule a single flush
+    app.canvas.create_rectangle.assert_called_once()
+    app.root.after.assert_called_once_with(FRAME_INTERVAL_MS, app._flush)  # noqa: SLF001
+    app.canvas.coords.assert_not_called()
+
+    app._flush()  # noqa: SLF001
+    app.canvas.coords.assert_called_once_with(app.selection_rect, 0, 0, 30, 30)
+    app.canvas.itemconfigure.assert_called_once_with(app.selection_rect, state="normal")
+
+
+def test_canvas_release_hides_selection_rectangle(app: App) -> None:
+    """Test that releasing a drag-selection hides the rectangle instead of deleting it."""
+    app.canvas.canvasx.side_effect = lambda v: v
+    app.canvas.canvasy.side_effect = lambda v: v
+
+    event = MagicMock()
+    event.x = 0
+    event.y = 0
+    app.on_canvas_click(event)
+    event.x = 30
+    event.y = 30
+    app.on_canvas_drag(event)
+    rect = app.selection_rect
+    app.on_canvas_release(event)
+
+    app.canvas.itemconfigure.assert_called_with(rect, state="hidden")
+    assert app.selection_rect == rect
+
+
+def test_canvas_drag_updates_selection_incrementally(app: App) -> None:
+    """Test that components are selected and deselected live as the drag-selection changes."""
+    app.groups["1.0"] = []
+    app.colors["1.0"] = "#FF0000"
+    near = Component(app, 0, 0, "1.0")
+    far = Component(app, 200, 0, "1.0")
+    app.canvas.canvasx.side_effect = lambda v: v
+    app.canvas.canvasy.side_effect = lambda v: v
+
+    event = MagicMock()
+    event.x = 0
+    event.y = 0
+    app.on_canvas_click(event)
+
+    event.x = 400
+    event.y = 200
+    app.on_canvas_drag(event)
+    app._flush()  # noqa: SLF001
+    assert set(app.selection) == {near, far}
+
+    with patch.object(Component, "select") as mock_select:
+        event.x = 150
+        app.on_canvas_drag(event)
+        app._flush()  # noqa: SLF001
+        mock_select.assert_not_called()  # already selected, not touched again
+    assert app.selection == [near]
+
+    app.on_canvas_release(event)
+    assert app.selection == [near]
+
+
+def test_batch_updates_defers_flush(app: App) -> None:
+    """Test that nested batches flush pending updates only when the outermost exits."""
+    app.selection_rect = 1
+    with app.batch_updates():
+        with app.batch_updates():
+            app._pending_rect_coords = (0, 0, 5, 5)  # noqa: SLF001
+            app._schedule_redraw()  # noqa: SLF001
+        app.canvas.coords.assert_not_called()
+    app.root.after.assert_not_called()
+    app.canvas.coords.assert_called_once_with(1, 0, 0, 5, 5)
+
+
+def test_redraw_canvas_redraws_every_component(app: App) -> None:
+    """Test that zoom redraws reach components in every group."""
+    app.groups["1.0"] = []
+    app.groups["2.0"] = []
+    app.colors["1.0"] = "#FF0000"
+    app.colors["2.0"] = "#00FF00"
+    comps = [Component(app, 0, 0, "1.0"), Component(app, 200, 200, "2.0")]
+
+    app.canvas.coords.reset_mock()
+    app.zoom_factor = 2.0
+    app.redraw_canvas()
+
+    assert app.canvas.coords.call_count == len(comps)
+    app.canvas.coords.assert_any_call(comps[1].comp, 400, 400, 600, 600)
+
+
+def test_redraw_canvas_skips_unchanged_components(app: App) -> None:
+    """Test that components are only given new coordinates when the zoom level or component size changes."""
+    app.colors["1.0"] = "#FF0000"
+    comp = Component(app, 10, 20, "1.0")
+    assert app.canvas.create_rectangle.call_args.args == (10, 20, 110, 120)
+
+    app.canvas.coords.reset_mock()
+    app.redraw_canvas()
+    app.canvas.coords.assert_not_called()
+
+    app.comp_width = 50
+    app.redraw_canvas()
+    app.canvas.coords.assert_called_once_with(comp.comp, 10, 20, 60, 120)
+
+
+def test_canvas_click_on_component_skips_drag_selection(app: App) -> None:
+    """Test that clicking a hovered component does not start a drag-selection."""
+    app.groups["1.0"] = []
+    app.colors["1.0"] = "#FF0000"
+    comp = Component(app, 50, 50, "1.0")
+    app.canvas.canvasx.side_effect = lambda v: v
+    app.canvas.canvasy.side_effect = lambda v: v
+
+    event = MagicMock()
+    event.x = 60
+    event.y = 60
+    comp.on_enter(event)
+    app.on_canvas_click(event)
+    assert app.selection_start_x is None
+
+    comp.on_leave(event)
+    assert app.hover_component is None
+    app.on_canvas_click(event)
+    assert app.selection_start_x == 60
+
+
+def test_canvas_offsets_cached_until_scroll(app: App) -> None:
+    """Test that canvas view offsets are only queried again after the view scrolls."""
+    app.canvas.canvasx.side_effect = lambda v: v + 100
+    app.canvas.canvasy.side_effect = lambda v: v + 50
+
+    event = MagicMock()
+    event.x = 10
+    event.y = 20
+    assert app._event_canvas_coords(event) == (110, 70)  # noqa: SLF001
+    assert app._event_canvas_coords(event) == (110, 70)  # noqa: SLF001
+    assert app.canvas.canvasx.call_count == 1
+
+    app.canvas.canvasx.side_effect = lambda v: v + 300
+    app._on_xscroll("0.1", "0.6")  # noqa: SLF001
+    assert app._event_canvas_coords(event) == (310, 70)  # noqa: SLF001
+    assert app.canvas.canvasx.call_count == 2
+    assert app.canvas.canvasy.call_count == 1
+
+
+def test_redraw_canvas_sets_scrollregion_once(app: App) -> None:
+    """Test that a zoom redraw applies the new scroll region in a single flush."""
+    app.canvas.config.reset_mock()
+    app.zoom_factor = 2.0
+    app.redraw_canvas()
+
+    region = (0, 0, CANVAS_WIDTH * 2, CANVAS_HEIGHT * 2)
+    scroll_calls = [c for c in app.canvas.config.call_args_list if "scrollregion" in c.kwargs]
+    assert len(scroll_calls) == 1
+    assert scroll_calls[0].kwargs["scrollregion"] == region
+
+
+def test_component_events_dispatched_from_shared_tag(app: App) -> None:
+    """Test that events bound once to the component tag reach the component under the pointer."""
+    app.colors["1.0"] = "#FF0000"
+    bindings = {c.args[1]: c.args[2] for c in app.canvas.tag_bind.call_args_list if c.args[0] == COMPONENT_TAG}
+    assert set(bindings) == {"<Button-1>", "<B1-Motion>", "<ButtonRelease-1>", "<Enter>", "<Leave>"}
+
+    app.canvas.tag_bind.reset_mock()
+    app.canvas.create_rectangle.side_effect = [10, 11]
+    comp = Component(app, 50, 50, "1.0")
+    other = Component(app, 300, 300, "1.0")
+    app.canvas.tag_bind.assert_not_called()
+
+    event = MagicMock()
+    event.state = 0
+    event.x = event.y = 0
+    app.canvas.find_withtag.return_value = (other.comp,)
+    bindings["<Enter>"](event)
+    assert app.hover_component is other
+
+    # The press goes to the hovered component, and motion and release to the pressed one, without lookups
+    app.canvas.find_withtag.reset_mock()
+    bindings["<Button-1>"](event)
+    assert app.selection == [other]
+    assert app.pressed_component is other
+    with patch.object(Component, "on_drag", autospec=True) as on_drag:
+        for _ in range(3):
+            bindings["<B1-Motion>"](event)
+    assert on_drag.call_count == 3
+    assert all(c.args[0] is other for c in on_drag.call_args_list)
+    bindings["<ButtonRelease-1>"](event)
+    assert app.pressed_component is None
+    app.canvas.find_withtag.assert_not_called()
+
+    app.canvas.find_withtag.return_value = ()
+    bindings["<Leave>"](event)
+    bindings["<Button-1>"](event)
+    assert app.selection == [other]
+
+    other.delete()
+    app.canvas.find_withtag.return_value = (other.comp,)
+    bindings["<Leave>"](event)
+    assert app.comp_by_id == {comp.comp: comp}
@@ -198,6 +198,6 @@ def test_tile_cancelled(component_menu: ComponentMenu) -> None:
 
 def test_run_cutout_tool(component_menu: ComponentMenu) -> None:
     """Test launching the component cutout tool."""
-    with patch("app.menus.component_menu.ComponentSelector") as mock_selector:
+    with patch("app.component_selector.ComponentSelector") as mock_selector:
         component_menu.run_cutout_tool()
         mock_selector.assert_called_once_with(parent=component_menu.app.root)
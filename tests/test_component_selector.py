@@ -1,13 +1,15 @@
 """Test suite for component selector module."""
 
 import tkinter as tk
+from collections import OrderedDict
 from collections.abc import Generator
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
 from PIL import Image
 
-from app.component_selector import ComponentSelector
+from app.component_selector import PREVIEW_CACHE_SIZE, ZOOM_REDRAW_DELAY_MS, ComponentSelector
 
 
 @pytest.fixture(autouse=True)
@@ -95,8 +97,9 @@ def component_selector(mock_tk: MagicMock, mock_image_ops: dict) -> ComponentSel
 
         # Manually set the attributes that would normally be set in __init__
         selector.zoom_factor = 0.5
+        selector._drawn_zoom = 0.5  # noqa: SLF001
         selector.input_zip = "test.zip"
-        selector.regions_data = [(100, 100, 200, 200), (300, 300, 400, 400)]
+        selector.regions_data = np.array([(100, 100, 200, 200), (300, 300, 400, 400)], dtype=np.int32)
         selector.selected_region_index = None
         selector.selected_bbox = None
         selector.original_img = mock_image_ops["mock_img"]
@@ -108,6 +111,7 @@ def component_selector(mock_tk: MagicMock, mock_image_ops: dict) -> ComponentSel
         selector.region_details_label = MagicMock()
         selector.highlight_rect = None
         selector.root = mock_tk
+        selector._zoom_redraw_after_id = None  # noqa: SLF001
 
         # Mock the redraw_image method to avoid PIL ImageTk issues
         selector.redraw_image = MagicMock()
@@ -119,7 +123,7 @@ def test_initialization(component_selector: ComponentSelector) -> None:
     """Test that ComponentSelector initializes correctly."""
     assert component_selector.zoom_factor > 0
     assert component_selector.input_zip == "test.zip"
-    assert component_selector.regions_data == [(100, 100, 200, 200), (300, 300, 400, 400)]
+    assert component_selector.regions_data.tolist() == [[100, 100, 200, 200], [300, 300, 400, 400]]
     assert component_selector.selected_region_index is None
     assert component_selector.selected_bbox is None
 
@@ -156,12 +160,21 @@ def test_get_input_zip_cancel() -> None:
         assert result == ""
 
 
+def fire_zoom_redraw(selector: ComponentSelector) -> None:
+    """Run the redraw most recently scheduled by a zoom step."""
+    delay, callback = selector.root.after.call_args[0]
+    assert delay == ZOOM_REDRAW_DELAY_MS
+    callback()
+
+
 def test_zoom_in(component_selector: ComponentSelector) -> None:
     """Test zoom in functionality."""
     initial_zoom = component_selector.zoom_factor
     component_selector.zoom_in()
     assert component_selector.zoom_factor == initial_zoom + 0.1
-    # Check that redraw_image was called
+    # Check that redraw_image was called once the zoom settled
+    component_selector.redraw_image.assert_not_called()
+    fire_zoom_redraw(component_selector)
     component_selector.redraw_image.assert_called_once()
 
 
@@ -170,7 +183,8 @@ def test_zoom_out(component_selector: ComponentSelector) -> None:
     initial_zoom = component_selector.zoom_factor
     component_selector.zoom_out()
     assert component_selector.zoom_factor == initial_zoom - 0.1
-    # Check that redraw_image was called
+    # Check that redraw_image was called once the zoom settled
+    fire_zoom_redraw(component_selector)
     component_selector.redraw_image.assert_called_once()
 
 
@@ -179,8 +193,23 @@ def test_zoom_out_minimum(component_selector: ComponentSelector) -> None:
     component_selector.zoom_factor = 0.15
     component_selector.zoom_out()
     assert component_selector.zoom_factor == 0.1  # Minimum zoom is 0.1
-    # Check that redraw_image was called
+    # Check that redraw_image was called once the zoom settled
+    fire_zoom_redraw(component_selector)
+    component_selector.redraw_image.assert_called_once()
+
+
+def test_zoom_burst_redraws_once(component_selector: ComponentSelector) -> None:
+    """Test that each zoom step restarts the redraw delay, so a burst of steps redraws only at the end."""
+    root = component_selector.root
+    root.after.side_effect = ["after#1", "after#2", "after#3"]
+    component_selector.zoom_in()
+    component_selector.zoom_in()
+    component_selector.zoom_out()
+
+    assert [c.args[0] for c in root.after_cancel.call_args_list] == ["after#1", "after#2"]
+    fire_zoom_redraw(component_selector)
     component_selector.redraw_image.assert_called_once()
+    assert component_selector._zoom_redraw_after_id is None  # noqa: SLF001
 
 
 def test_show_region_details(component_selector: ComponentSelector) -> None:
@@ -188,6 +217,10 @@ def test_show_region_details(component_selector: ComponentSelector) -> None:
     component_selector.show_region_details(0)
     assert component_selector.selected_region_index == 0
     assert component_selector.selected_bbox == (100, 100, 200, 200)
+    assert all(type(v) is int for v in component_selector.selected_bbox)
+    component_selector.region_details_label.config.assert_called_once_with(
+        text="Selected Region 1 : bbox=(100, 100, 200, 200)",
+    )
 
 
 def test_on_canvas_click_hit(component_selector: ComponentSelector) -> None:
@@ -201,8 +234,8 @@ def test_on_canvas_click_hit(component_selector: ComponentSelector) -> None:
     component_selector.preview_canvas.canvasx.return_value = 150
     component_selector.preview_canvas.canvasy.return_value = 150
 
-    # Set zoom factor to 1 for simplicity
-    component_selector.zoom_factor = 1.0
+    # Set the displayed zoom to 1 for simplicity
+    component_selector._drawn_zoom = 1.0  # noqa: SLF001
 
     # Call the click handler
     component_selector.on_canvas_click(event)
@@ -212,6 +245,35 @@ def test_on_canvas_click_hit(component_selector: ComponentSelector) -> None:
     assert component_selector.selected_bbox == (100, 100, 200, 200)
 
 
+def test_on_canvas_click_first_of_overlapping(component_selector: ComponentSelector) -> None:
+    """Test that a click on the shared edge of overlapping regions selects the first one listed."""
+    component_selector.regions_data = np.array([(0, 0, 10, 10), (300, 300, 400, 400), (200, 200, 300, 300)])
+    component_selector.preview_canvas.canvasx.return_value = 150
+    component_selector.preview_canvas.canvasy.return_value = 150
+    component_selector._drawn_zoom = 0.5  # noqa: SLF001
+
+    component_selector.on_canvas_click(MagicMock())
+
+    assert component_selector.selected_region_index == 1
+    assert component_selector.selected_bbox == (300, 300, 400, 400)
+
+
+def test_on_canvas_click_during_pending_zoom(component_selector: ComponentSelector) -> None:
+    """Test that a click before a zoom step is drawn maps against the image still on screen."""
+    component_selector._drawn_zoom = 1.0  # noqa: SLF001
+    component_selector.zoom_factor = 1.0
+    component_selector.zoom_in()
+    component_selector.zoom_in()
+    component_selector.preview_canvas.canvasx.return_value = 150
+    component_selector.preview_canvas.canvasy.return_value = 150
+
+    component_selector.on_canvas_click(MagicMock())
+
+    component_selector.redraw_image.assert_not_called()
+    assert component_selector.selected_region_index == 0
+    assert component_selector.preview_canvas.create_rectangle.call_args[0] == (100, 100, 201, 201)
+
+
 def test_on_canvas_click_miss(component_selector: ComponentSelector) -> None:
     """Test canvas click that misses all regions."""
     # Create a mock event
@@ -223,8 +285,8 @@ def test_on_canvas_click_miss(component_selector: ComponentSelector) -> None:
     component_selector.preview_canvas.canvasx.return_value = 50
     component_selector.preview_canvas.canvasy.return_value = 50
 
-    # Set zoom factor to 1 for simplicity
-    component_selector.zoom_factor = 1.0
+    # Set the displayed zoom to 1 for simplicity
+    component_selector._drawn_zoom = 1.0  # noqa: SLF001
 
     # Set initial selection to check it doesn't change
     component_selector.selected_region_index = 0
@@ -294,7 +356,7 @@ def test_update_selection_box_with_selection(component_selector: ComponentSelect
     """Test update_selection_box with a selection."""
     # Set up a selected region
     component_selector.selected_bbox = (100, 100, 200, 200)
-    component_selector.zoom_factor = 0.5
+    component_selector._drawn_zoom = 0.5  # noqa: SLF001
     component_selector.highlight_rect = None
 
     # Mock the canvas create_rectangle method
@@ -316,7 +378,7 @@ def test_update_selection_box_existing_highlight(component_selector: ComponentSe
     """Test update_selection_box with existing highlight rectangle."""
     # Set up a selected region and existing highlight
     component_selector.selected_bbox = (100, 100, 200, 200)
-    component_selector.zoom_factor = 0.5
+    component_selector._drawn_zoom = 0.5  # noqa: SLF001
     component_selector.highlight_rect = 456  # Existing rectangle ID
 
     # Mock the canvas methods
@@ -335,44 +397,104 @@ def test_update_selection_box_existing_highlight(component_selector: ComponentSe
     assert component_selector.highlight_rect == 789
 
 
-def test_redraw_image() -> None:
-    """Test redraw_image method."""
-    # Create a mock image with resize method
-    mock_image = MagicMock()
-    mock_image.width = 800
-    mock_image.height = 600
-
-    # Create a resized image mock
-    resized_img = MagicMock()
-    mock_image.resize = MagicMock(return_value=resized_img)
-
-    # Create a mock component selector
+def make_redraw_selector(mock_image: MagicMock, view: tuple[float, float] = (0.0, 1.0)) -> MagicMock:
+    """Create a stand-in selector for calling redraw_image, with the given visible fraction on both axes."""
     selector = MagicMock(spec=ComponentSelector)
     selector.original_img = mock_image
     selector.zoom_factor = 0.5
     selector.preview_canvas = MagicMock()
+    selector.preview_canvas.xview.return_value = view
+    selector.preview_canvas.yview.return_value = view
     selector.preview_canvas_img = MagicMock()
+    selector._resize_cache = OrderedDict()  # noqa: SLF001
+    return selector
 
-    # Get the actual method from the class
-    redraw_method = ComponentSelector.redraw_image
+
+def test_redraw_image() -> None:
+    """Test redraw_image method."""
+    # Create a mock image whose crop is resized
+    mock_image = MagicMock()
+    mock_image.width = 800
+    mock_image.height = 600
+    cropped_img = mock_image.crop.return_value
+
+    selector = make_redraw_selector(mock_image)
 
     # Call the method with our mock
     with patch("PIL.ImageTk.PhotoImage", return_value="new_image"):
-        redraw_method(selector)
+        ComponentSelector.redraw_image(selector)
 
-    # Check that resize was called with correct dimensions
-    mock_image.resize.assert_called_once_with((400, 300))  # 800*0.5, 600*0.5
+    # Check that the whole image was cropped and resized with correct dimensions
+    mock_image.crop.assert_called_once_with((0, 0, 800, 600))
+    cropped_img.resize.assert_called_once_with((400, 300))  # 800*0.5, 600*0.5
 
     # Check that the canvas was updated
     selector.preview_canvas.itemconfig.assert_called_once_with(selector.preview_canvas_img, image="new_image")
+    selector.preview_canvas.coords.assert_called_once_with(selector.preview_canvas_img, 0, 0)
 
     # Check that the scrollregion was updated
     selector.preview_canvas.config.assert_called_once_with(scrollregion=(0, 0, 400, 300))
+    assert selector._drawn_zoom == 0.5  # noqa: SLF001
 
     # Check that update_selection_box was called
     selector.update_selection_box.assert_called_once()
 
 
+def test_redraw_image_scales_only_visible_part() -> None:
+    """Test that a scrolled view crops to the visible source pixels and places the preview where they belong."""
+    mock_image = MagicMock()
+    mock_image.width = 800
+    mock_image.height = 600
+    selector = make_redraw_selector(mock_image, view=(0.25, 0.5))
+    selector.zoom_factor = 2.0
+
+    with patch("PIL.ImageTk.PhotoImage"):
+        ComponentSelector.redraw_image(selector)
+
+    mock_image.crop.assert_called_once_with((200, 150, 400, 300))
+    mock_image.crop.return_value.resize.assert_called_once_with((400, 300))
+    selector.preview_canvas.coords.assert_called_once_with(selector.preview_canvas_img, 400, 300)
+    selector.preview_canvas.config.assert_called_once_with(scrollregion=(0, 0, 1600, 1200))
+
+
+def test_redraw_image_reuses_cached_views() -> None:
+    """Test that returning to a recent view reuses its preview and that old previews are evicted."""
+    mock_image = MagicMock()
+    mock_image.width = 800
+    mock_image.height = 600
+    selector = make_redraw_selector(mock_image)
+
+    zooms = [0.5 + 0.1 * i for i in range(PREVIEW_CACHE_SIZE + 1)]
+    with patch("PIL.ImageTk.PhotoImage", side_effect=lambda img: MagicMock()):
+        for zoom in [*zooms[:2], zooms[0]]:
+            selector.zoom_factor = zoom
+            ComponentSelector.redraw_image(selector)
+        assert mock_image.crop.call_count == 2
+
+        for zoom in zooms:
+            selector.zoom_factor = zoom
+            ComponentSelector.redraw_image(selector)
+
+    assert mock_image.crop.call_count == PREVIEW_CACHE_SIZE + 1
+    assert len(selector._resize_cache) == PREVIEW_CACHE_SIZE  # noqa: SLF001
+    assert selector.preview_img is next(reversed(selector._resize_cache.values()))  # noqa: SLF001
+
+
+def test_scrolling_coalesces_redraws(component_selector: ComponentSelector) -> None:
+    """Test that a burst of scroll events scrolls the canvas each time but redraws the image once."""
+    component_selector._redraw_pending = False  # noqa: SLF001
+    component_selector._on_xscroll("moveto", "0.2")  # noqa: SLF001
+    component_selector._on_yscroll("scroll", "1", "units")  # noqa: SLF001
+
+    component_selector.preview_canvas.xview.assert_called_once_with("moveto", "0.2")
+    component_selector.preview_canvas.yview.assert_called_once_with("scroll", "1", "units")
+    component_selector.root.after_idle.assert_called_once()
+    component_selector.redraw_image.assert_not_called()
+
+    component_selector.root.after_idle.call_args[0][0]()
+    component_selector.redraw_image.assert_called_once()
+
+
 def test_create_widgets(component_selector: ComponentSelector) -> None:
     """Test _create_widgets method."""
     # Create mocks for all the tkinter components
@@ -486,7 +608,8 @@ def test_init_with_valid_input() -> None:
         # Check that the instance was initialized with the correct attributes
         assert selector.input_zip == "test.zip"
         assert selector.original_img == mock_image
-        assert selector.regions_data == regions
+        assert selector.regions_data.dtype == np.int32
+        assert selector.regions_data.tolist() == [list(region) for region in regions]
         assert selector.selected_bbox is None
 
         # Check that mainloop was called
@@ -1,15 +1,22 @@
 """Test suite for exposure optimizer functions."""
 
+import io
 import json
 import zipfile
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pytest
 from PIL import Image, ImageChops
 
+import app.exposure_optimizer
 from app.constants import CANVAS_HEIGHT, CANVAS_WIDTH
 from app.exposure_optimizer import (
+    PARALLEL_QUEUE_DEPTH,
+    _optimize_layers_parallel,
+    combine_exposures,
     group_by_settings,
     optimize_layer,
     optimize_print_file,
@@ -133,7 +140,8 @@ def test_optimize_layer_zero_exposure(sample_images: dict[str, Image.Image]) ->
     optimized_settings, new_images = optimize_layer(settings, images)
     assert len(optimized_settings) == 1
     assert optimized_settings[0]["Layer exposure time (ms)"] == 1000
-    assert len(new_images) > 0  # Should have created a new optimized image
+    assert optimized_settings[0]["Image file"] == "image2.png"  # Only image2 needs exposure, so it is reused
+    assert new_images == {}
 
 
 def test_optimize_layer_identical_exposures(sample_images: dict[str, Image.Image]) -> None:
@@ -250,13 +258,13 @@ def test_optimize_layer_overlapping_images(sample_images: dict[str, Image.Image]
 
     # Should have two optimized settings, one for each image
     assert len(optimized_settings) == 2
-    assert len(new_images) == 2  # Each image should be optimized separately
+    assert new_images == {}  # Each image is exposed on its own, so the originals are reused
 
     # Verify the optimized images have the correct exposure times
+    assert {setting["Image file"] for setting in optimized_settings} == {"image1.png", "image3.png"}
     for setting in optimized_settings:
         assert setting["Layer exposure time (ms)"] == 1000
         assert setting["Other setting"] == "value1"
-        assert "_opt_" in setting["Image file"]
 
 
 def test_optimize_layer_progressive_exposures(sample_images: dict[str, Image.Image]) -> None:
@@ -284,9 +292,173 @@ def test_optimize_layer_progressive_exposures(sample_images: dict[str, Image.Ima
     expected_first = ImageChops.lighter(test_images["image1.png"], test_images["image2.png"])
     assert ImageChops.difference(first_img, expected_first).getbbox() is None
 
-    # Second setting should be just image2 exposed for additional 1000ms
+    # Second setting should be just image2 exposed for additional 1000ms, reusing the original image
     assert second["Layer exposure time (ms)"] == 1000
-    assert "_opt_" in second["Image file"]
-    second_img = new_images[second["Image file"]]
-    # The second image should be just image2 since it needs more exposure
-    assert ImageChops.difference(second_img, test_images["image2.png"]).getbbox() is None
+    assert second["Image file"] == "image2.png"
+    assert second["Image file"] not in new_images
+
+
+def test_combine_exposures_steps(sample_images: dict[str, Image.Image]) -> None:
+    """Test that each exposure step composites every image that still needs exposure."""
+    names = ["image1.png", "image2.png", "image3.png"]
+    group = [
+        {"Image file": "image1.png", "Layer exposure time (ms)": 1000},
+        {"Image file": "image2.png", "Layer exposure time (ms)": 1000},
+        {"Image file": "image3.png", "Layer exposure time (ms)": 2500},
+    ]
+    new_settings, new_images = combine_exposures(group, [sample_images[name] for name in names])
+
+    assert [s["Layer exposure time (ms)"] for s in new_settings] == [1000, 1500]
+    first = new_images[new_settings[0]["Image file"]]
+    expected_first = ImageChops.lighter(sample_images["image1.png"], sample_images["image2.png"])
+    expected_first = ImageChops.lighter(expected_first, sample_images["image3.png"])
+    assert ImageChops.difference(first, expected_first).getbbox() is None
+
+    # Only image3 needs the second step, so its file is reused rather than duplicated
+    assert new_settings[1]["Image file"] == "image3.png"
+    assert len(new_images) == 1
+
+
+def test_optimize_print_settings_does_not_mutate_inputs(
+    sample_image_settings: list[dict[str, Any]],
+    sample_images: dict[str, Image.Image],
+) -> None:
+    """Test that the input settings and images are left untouched."""
+    print_settings = {"Layers": [{"Image settings list": sample_image_settings}]}
+    settings_before = json.dumps(print_settings)
+    pixels_before = {name: img.tobytes() for name, img in sample_images.items()}
+    names_before = set(sample_images)
+
+    optimize_print_settings(print_settings, sample_images)
+
+    assert json.dumps(print_settings) == settings_before
+    assert set(sample_images) == names_before
+    assert {name: img.tobytes() for name, img in sample_images.items()} == pixels_before
+
+
+def test_optimize_print_settings_parallel_matches_serial(
+    monkeypatch: pytest.MonkeyPatch,
+    sample_images: dict[str, Image.Image],
+) -> None:
+    """Test that optimizing layers in worker processes gives the same result as optimizing them in turn."""
+    layer = {
+        "Image settings list": [
+            {"Image file": "image1.png", "Layer exposure time (ms)": 1000, "Other setting": "value1"},
+            {"Image file": "image2.png", "Layer exposure time (ms)": 2000, "Other setting": "value1"},
+        ],
+    }
+    print_settings = {"Layers": [layer, {"Image settings list": []}, layer]}
+
+    serial_settings, serial_images = optimize_print_settings(print_settings, sample_images)
+    monkeypatch.setattr(app.exposure_optimizer, "PARALLEL_MIN_LAYERS", 1)
+    monkeypatch.setattr(app.exposure_optimizer.os, "cpu_count", lambda: 2)
+    parallel_settings, parallel_images = optimize_print_settings(print_settings, sample_images)
+
+    assert parallel_settings == serial_settings
+    assert parallel_images.keys() == serial_images.keys()
+    for name, img in serial_images.items():
+        assert ImageChops.difference(parallel_images[name], img).getbbox() is None
+
+
+def test_optimize_layers_parallel_bounds_jobs_in_flight(sample_images: dict[str, Image.Image]) -> None:
+    """Test that the parallel path only loads a few layers ahead of the results consumed, and keeps their order."""
+    workers = 2
+    layer_settings = [
+        [{"Image file": "image1.png", "Layer exposure time (ms)": 1000 * (i + 1), "Other setting": "value1"}]
+        for i in range(10)
+    ]
+    fetched = 0
+
+    def jobs() -> Iterator[tuple[list[dict[str, Any]], dict[str, Image.Image]]]:
+        nonlocal fetched
+        for image_settings in layer_settings:
+            fetched += 1
+            yield image_settings, {"image1.png": sample_images["image1.png"]}
+
+    results = []
+    for result in _optimize_layers_parallel(jobs(), workers):
+        assert fetched - len(results) <= PARALLEL_QUEUE_DEPTH * workers
+        results.append(result)
+
+    assert [settings for settings, _ in results] == [optimize_layer(s, sample_images)[0] for s in layer_settings]
+
+
+def test_combine_exposures_skips_empty_composites(
+    empty_image: Image.Image,
+    sample_images: dict[str, Image.Image],
+) -> None:
+    """Test that exposure steps left with only empty images produce no composite."""
+    group = [
+        {"Image file": "image1.png", "Layer exposure time (ms)": 1000},
+        {"Image file": "empty.png", "Layer exposure time (ms)": 2000},
+    ]
+    new_settings, new_images = combine_exposures(group, [sample_images["image1.png"], empty_image])
+
+    assert new_settings == [{"Image file": "image1.png", "Layer exposure time (ms)": 1000}]
+    assert new_images == {}
+
+
+def test_combine_exposures_leaves_scratch_zeroed(sample_images: dict[str, Image.Image]) -> None:
+    """Test that a shared scratch buffer is zeroed again so later calls can reuse it."""
+    group = [
+        {"Image file": "image1.png", "Layer exposure time (ms)": 1000},
+        {"Image file": "image2.png", "Layer exposure time (ms)": 1000},
+    ]
+    images = [sample_images["image1.png"], sample_images["image2.png"]]
+    scratch = np.zeros((CANVAS_HEIGHT, CANVAS_WIDTH), dtype=np.uint8)
+
+    _, first_images = combine_exposures(group, images, scratch=scratch)
+    assert not scratch.any()
+    _, second_images = combine_exposures(group, images, scratch=scratch)
+
+    (first,) = first_images.values()
+    (second,) = second_images.values()
+    assert ImageChops.difference(first, second).getbbox() is None
+
+
+def test_optimize_print_file_with_images(tmp_path: Path, sample_images: dict[str, Image.Image]) -> None:
+    """Test optimizing a print file whose images are loaded from the zip as needed."""
+    zip_path = tmp_path / "test.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        settings = {
+            "Layers": [
+                {
+                    "Image settings list": [
+                        {"Image file": "image1.png", "Layer exposure time (ms)": 1000},
+                        {"Image file": "image2.png", "Layer exposure time (ms)": 1000},
+                    ],
+                },
+            ],
+        }
+        zf.writestr("print_settings.json", json.dumps(settings))
+        for name in ("image1.png", "image2.png"):
+            buf = io.BytesIO()
+            sample_images[name].save(buf, format="PNG")
+            zf.writestr(f"slices/{name}", buf.getvalue())
+
+    output_path = tmp_path / "out.zip"
+    optimize_print_file(zip_path, output_path)
+
+    with zipfile.ZipFile(output_path, "r") as zf:
+        result = json.loads(zf.read("print_settings.json"))
+        (setting,) = result["Layers"][0]["Image settings list"]
+        with zf.open(f"slices/{setting['Image file']}") as f:
+            composite = Image.open(f).convert("L")
+    expected = ImageChops.lighter(sample_images["image1.png"], sample_images["image2.png"])
+    assert ImageChops.difference(composite, expected).getbbox() is None
+
+
+def test_optimize_print_settings_shares_input_images(
+    sample_image_settings: list[dict[str, Any]],
+    sample_images: dict[str, Image.Image],
+) -> None:
+    """Test that input images are passed through as the same objects rather than copied."""
+    originals = dict(sample_images)
+    print_settings = {"Layers": [{"Image settings list": sample_image_settings}]}
+
+    _, all_images = optimize_print_settings(print_settings, sample_images)
+
+    assert all_images is not sample_images
+    for name, img in originals.items():
+        assert sample_images[name] is img
+        assert all_images[name] is img
@@ -83,7 +83,7 @@ def test_load_component_success(file_menu: FileMenu) -> None:
 
     with (
         patch("tkinter.filedialog.askopenfilename", return_value=mock_file_path),
-        patch("app.menus.file_menu.get_component_dimensions", return_value=(200, 150)),
+        patch("app.image_ops.get_component_dimensions", return_value=(200, 150)),
         patch("tkinter.messagebox.showinfo"),
     ):
         file_menu.load_component()
@@ -272,7 +272,7 @@ def test_generate_print_file_success(file_menu: FileMenu) -> None:
 
     with (
         patch("tkinter.filedialog.asksaveasfilename", return_value="output.json"),
-        patch("app.menus.file_menu.new_print_file") as mock_new_print_file,
+        patch("app.gen_print_file.new_print_file") as mock_new_print_file,
         patch("app.menus.file_menu.Popup") as mock_popup,
     ):
         file_menu.generate_print_file()
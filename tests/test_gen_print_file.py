@@ -4,11 +4,15 @@ import io
 import json
 import zipfile
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
-from PIL import Image
+from PIL import Image, ImageChops
 
-from app.gen_print_file import new_print_file
+import app.gen_print_file
+from app.constants import CANVAS_HEIGHT, CANVAS_WIDTH
+from app.gen_print_file import _placement_slices, gen_group_composite, new_print_file
+from app.print_file_utils import LazyImageStore
 
 
 @pytest.fixture
@@ -112,3 +116,62 @@ def test_new_print_file_group_scaling(tmp_path: Path, test_component_zip: Path)
         assert (
             expected_exposures == found_exposures
         ), f"Incorrect exposure scaling. Expected {expected_exposures}, found {found_exposures}"
+
+
+def test_gen_group_composite_matches_paste() -> None:
+    """Test that the composite matches pasting each copy onto the canvas, including copies clipped at its edges."""
+    base = Image.new("L", (100, 80), 0)
+    base.paste(200, (10, 10, 90, 70))
+    base.paste(255, (40, 30, 60, 50))
+    offsets = [
+        {"x": 0, "y": 0},
+        {"x": 50, "y": 40},  # Overlaps the first copy
+        {"x": -30, "y": CANVAS_HEIGHT - 50},  # Clipped at the left and bottom
+        {"x": CANVAS_WIDTH - 20, "y": -10},  # Clipped at the right and top
+        {"x": CANVAS_WIDTH + 5, "y": 0},  # Entirely off the canvas
+    ]
+
+    expected = Image.new("L", (CANVAS_WIDTH, CANVAS_HEIGHT), 0)
+    for offset in offsets:
+        layer = Image.new("L", (CANVAS_WIDTH, CANVAS_HEIGHT), 0)
+        layer.paste(base, (offset["x"], offset["y"]))
+        expected = ImageChops.lighter(expected, layer)
+
+    composite = gen_group_composite(base, offsets)
+    assert composite.mode == "L"
+    assert ImageChops.difference(composite, expected).getbbox() is None
+
+    # Placements computed ahead of time give the same composite
+    slices = _placement_slices(offsets, (base.height, base.width))
+    assert len(slices) == 4
+    assert ImageChops.difference(gen_group_composite(base, offsets, slices), expected).getbbox() is None
+
+
+def test_new_print_file_reuses_composites(tmp_path: Path, test_component_zip: Path) -> None:
+    """Test that a slice used by several layers is decoded once and composited once per group."""
+    with zipfile.ZipFile(test_component_zip) as zf:
+        settings = json.loads(zf.read("print_settings.json"))
+        slice_bytes = zf.read("slices/slice_1.png")
+    settings["Layers"] *= 3
+    input_path = tmp_path / "repeated.zip"
+    with zipfile.ZipFile(input_path, "w") as zf:
+        zf.writestr("print_settings.json", json.dumps(settings))
+        zf.writestr("slices/slice_1.png", slice_bytes)
+
+    output_path = tmp_path / "output.zip"
+    components = [{"x": 0, "y": 0, "group": "100"}, {"x": 200, "y": 0, "group": "50"}]
+    with (
+        patch.object(app.gen_print_file, "gen_group_composite", wraps=gen_group_composite) as mock_composite,
+        patch.object(LazyImageStore, "__getitem__", autospec=True, side_effect=LazyImageStore.__getitem__) as mock_get,
+    ):
+        new_print_file(input_path, output_path, components)
+
+    assert mock_composite.call_count == 2
+    assert mock_get.call_count == 1  # The input slice is decoded once for both groups
+    with zipfile.ZipFile(output_path) as zf:
+        result = json.loads(zf.read("print_settings.json"))
+        assert len(result["Layers"]) == 3
+        assert {n for n in zf.namelist() if n.startswith("slices/") and n != "slices/"} == {
+            "slices/slice_1_100.png",
+            "slices/slice_1_50.png",
+        }
@@ -1,10 +1,13 @@
 """Test suite for graph coloring functionality."""
 
+from unittest.mock import patch
+
+import numpy as np
 import pytest
 from PIL import Image
 
 from app.constants import CANVAS_HEIGHT, CANVAS_WIDTH
-from app.graph_coloring import partition_images
+from app.graph_coloring import check_overlap, find_candidate_pairs, get_bbox, greedy_color, partition_images
 
 
 @pytest.fixture
@@ -90,3 +93,145 @@ def test_partition_overlapping_images() -> None:
     assert len(partitions[1]) == 1
     assert "img1.png" in partitions[0] or "img1.png" in partitions[1]
     assert "img2.png" in partitions[0] or "img2.png" in partitions[1]
+
+
+def test_check_overlap_bboxes_intersect_without_shared_pixels(empty_image: Image.Image) -> None:
+    """Test that intersecting bounding boxes alone do not count as an overlap.
+
+    Parameters
+    ----------
+    empty_image : Image.Image
+        Fixture providing an empty test image.
+
+    """
+    img1 = empty_image.copy()
+    img2 = empty_image.copy()
+
+    # Two L-shapes whose bounding boxes intersect but whose pixels do not
+    img1.paste(255, (0, 0, 100, 10))
+    img1.paste(255, (0, 0, 10, 100))
+    img2.paste(255, (50, 90, 150, 100))
+    img2.paste(255, (140, 50, 150, 100))
+
+    assert not check_overlap(img1, img2)
+
+    img2.paste(255, (5, 5, 6, 6))
+    assert check_overlap(img1, img2)
+
+
+def test_find_candidate_pairs() -> None:
+    """Test that only pairs with intersecting bounding boxes are returned."""
+    bboxes = {
+        "a.png": (0, 0, 100, 100),
+        "b.png": (50, 50, 150, 150),  # Intersects a
+        "c.png": (100, 0, 200, 40),  # Touches a, intersects nothing
+        "d.png": (120, 120, 130, 130),  # Inside b
+        "e.png": None,  # Empty image
+    }
+    pairs = {frozenset(pair) for pair in find_candidate_pairs(bboxes)}
+    assert pairs == {frozenset(("a.png", "b.png")), frozenset(("b.png", "d.png"))}
+
+
+def test_get_bbox_matches_pil(empty_image: Image.Image) -> None:
+    """Test that the array bounding box matches PIL's for empty and non-empty images.
+
+    Parameters
+    ----------
+    empty_image : Image.Image
+        Fixture providing an empty test image.
+
+    """
+    assert get_bbox(np.asarray(empty_image)) is None
+
+    img = empty_image.copy()
+    img.paste(255, (30, 40, 50, 60))
+    img.paste(128, (200, 10, 201, 11))
+    assert get_bbox(np.asarray(img)) == img.getbbox()
+
+
+def test_partition_disjoint_bboxes_skips_pixel_checks(empty_image: Image.Image) -> None:
+    """Test that images with disjoint bounding boxes are grouped without any pixel-level checks.
+
+    Parameters
+    ----------
+    empty_image : Image.Image
+        Fixture providing an empty test image.
+
+    """
+    images = {}
+    for i in range(5):
+        img = empty_image.copy()
+        img.paste(255, (i * 100, 0, i * 100 + 50, 50))
+        images[f"img{i}.png"] = img
+
+    with patch("app.graph_coloring.build_conflict_graph") as mock_build:
+        partitions = partition_images(images)
+
+    mock_build.assert_not_called()
+    assert partitions == {0: list(images)}
+
+
+def test_partition_interleaved_sparse_images(empty_image: Image.Image) -> None:
+    """Test sparse images whose bounding boxes coincide but whose pixels only interleave.
+
+    Parameters
+    ----------
+    empty_image : Image.Image
+        Fixture providing an empty test image.
+
+    """
+    img1 = empty_image.copy()
+    img2 = empty_image.copy()
+    img3 = empty_image.copy()
+
+    # Dots on a checkerboard of 100 pixel cells: img1 and img2 take alternate cells, img3 shares a dot with img2
+    for row in range(10):
+        for col in range(10):
+            box = (col * 100, row * 100, col * 100 + 10, row * 100 + 10)
+            (img1 if (row + col) % 2 == 0 else img2).paste(255, box)
+    img3.paste(255, (0, 0, 1, 1))
+    img3.paste(255, (105, 5, 1000, 6))
+
+    partitions = partition_images({"img1.png": img1, "img2.png": img2, "img3.png": img3})
+    groups = {frozenset(names) for names in partitions.values()}
+    assert frozenset({"img1.png", "img2.png"}) in groups
+    assert not any({"img2.png", "img3.png"} <= names for names in groups)
+
+
+def test_partition_images_threads_only_when_asked(empty_image: Image.Image) -> None:
+    """Test that images are packed serially by default and give the same partitions when packed on threads.
+
+    Parameters
+    ----------
+    empty_image : Image.Image
+        Fixture providing an empty test image.
+
+    """
+    images = {}
+    for i in range(4):
+        img = empty_image.copy()
+        img.paste(255, (i * 100, 0, i * 100 + 150, 150))
+        images[f"img{i}.png"] = img
+
+    with patch("app.graph_coloring.ThreadPoolExecutor") as mock_executor:
+        serial = partition_images(images)
+    mock_executor.assert_not_called()
+
+    assert partition_images(images, max_workers=4) == serial
+
+
+def test_greedy_color() -> None:
+    """Test that neighbors get different colors and that high-degree nodes are colored first."""
+    # A wheel: a hub joined to a cycle of five nodes, which needs four colors
+    rim = ["r0", "r1", "r2", "r3", "r4"]
+    graph: dict[str, list[str]] = {"hub": list(rim), "lone": []}
+    for i, node in enumerate(rim):
+        graph[node] = ["hub", rim[i - 1], rim[(i + 1) % len(rim)]]
+
+    coloring = greedy_color(graph)
+    assert set(coloring) == set(graph)
+    assert coloring["hub"] == 0
+    assert coloring["lone"] == 0
+    for node, neighbors in graph.items():
+        assert all(coloring[node] != coloring[neighbor] for neighbor in neighbors)
+    assert max(coloring.values()) == 3
@@ -177,6 +177,27 @@ def test_build_menu(group_menu: GroupMenu) -> None:
         assert menu_mock.add_radiobutton.call_count >= 2
 
 
+def test_build_menu_reuses_color_boxes(group_menu: GroupMenu) -> None:
+    """Test that color swatches are created once per color and reused across rebuilds."""
+    group_menu.app.groups = {"Group1": [], "Group2": []}
+    group_menu.app.colors = {"Group1": "red", "Group2": "red"}
+    group_menu.app.color_boxes = {}
+    group_menu.menu = MagicMock()
+
+    with patch.object(GroupMenu, "create_color_box", side_effect=lambda _: MagicMock()) as mock_create:
+        GroupMenu.build_menu(group_menu)
+        GroupMenu.build_menu(group_menu)
+
+        mock_create.assert_called_once_with("red")
+        assert group_menu.app.color_boxes["Group1"] is group_menu.app.color_boxes["Group2"]
+
+        # Changing a color creates a new swatch and drops the unused one
+        group_menu.app.colors["Group1"] = group_menu.app.colors["Group2"] = "blue"
+        GroupMenu.build_menu(group_menu)
+        assert mock_create.call_count == 2
+        assert set(group_menu._color_box_cache) == {"blue"}  # noqa: SLF001
+
+
 def test_new_group_success(group_menu: GroupMenu) -> None:
     """Test creating a new group successfully."""
     with (
@@ -190,14 +211,18 @@ def test_new_group_success(group_menu: GroupMenu) -> None:
 
         group_menu.set_group_color = MagicMock(side_effect=mock_set_color)
 
+        group_menu._group_entries = ["Group1", "Group2"]  # noqa: SLF001
         group_menu.new_group()
 
         # Verify new group was added
         assert "3.5" in group_menu.app.groups
         assert group_menu.app.colors["3.5"] == "#ff0000"
 
-        # Verify menu was rebuilt
-        group_menu.build_menu.assert_called_once()
+        # Verify a menu entry was inserted after the existing groups instead of rebuilding
+        group_menu.build_menu.assert_not_called()
+        group_menu.menu.insert_radiobutton.assert_called_once()
+        assert group_menu.menu.insert_radiobutton.call_args.args == (6,)
+        assert group_menu.menu.insert_radiobutton.call_args.kwargs["value"] == "3.5"
 
 
 def test_new_group_invalid_name(group_menu: GroupMenu) -> None:
@@ -237,11 +262,11 @@ def test_delete_group_success(group_menu: GroupMenu) -> None:
     # Setup mock components
     mock_comp = MagicMock()
     group_menu.app.groups = {"Group1": [mock_comp], "Group2": []}
+    group_menu._group_entries = ["Group1", "Group2"]  # noqa: SLF001
     group_menu.current_group.get.return_value = "Group1"
 
     with (
         patch("tkinter.messagebox.askyesno", return_value=True),
-        patch.object(GroupMenu, "build_menu"),
         patch.object(GroupMenu, "_check_group_selected", return_value="Group1"),
     ):
         group_menu.delete_group()
@@ -252,8 +277,11 @@ def test_delete_group_success(group_menu: GroupMenu) -> None:
         # Verify components were deleted
         mock_comp.delete.assert_called_once()
 
-        # Verify menu was rebuilt
-        assert group_menu.build_menu.called
+        # Verify only the group's menu entry was removed
+        group_menu.build_menu.assert_not_called()
+        group_menu.menu.delete.assert_called_once_with(4)
+        assert group_menu._group_entries == ["Group2"]  # noqa: SLF001
+        group_menu.current_group.set.assert_called_with("Group2")
 
 
 def test_delete_group_cancelled(group_menu: GroupMenu) -> None:
@@ -282,6 +310,7 @@ def test_rename_group_success(group_menu: GroupMenu) -> None:
     mock_comp.group = "Group1"
     group_menu.app.groups = {"Group1": [mock_comp], "Group2": []}
     group_menu.app.colors = {"Group1": "red", "Group2": "blue"}
+    group_menu._group_entries = ["Group1", "Group2"]  # noqa: SLF001
 
     # Setup mock selection
     mock_selection = MagicMock()
@@ -305,8 +334,10 @@ def test_rename_group_success(group_menu: GroupMenu) -> None:
         assert "3.5" in group_menu.app.colors
         assert group_menu.app.colors["3.5"] == "red"
 
-        # Verify menu was rebuilt
-        group_menu.build_menu.assert_called_once()
+        # Verify the group kept its position and its menu entry was relabelled in place
+        assert list(group_menu.app.groups) == ["3.5", "Group2"]
+        group_menu.build_menu.assert_not_called()
+        group_menu.menu.entryconfigure.assert_called_once_with(4, label="  3.5", value="3.5")
 
         # Verify current group was set
         group_menu.current_group.set.assert_called_with("3.5")
@@ -341,18 +372,21 @@ def test_set_group_color(group_menu: GroupMenu) -> None:
     group_menu.app.groups = {"Group1": [], "Group2": []}
     group_menu.app.colors = {"Group1": "red", "Group2": "blue"}
 
+    group_menu._group_entries = ["Group1", "Group2"]  # noqa: SLF001
+
     with (
         patch.object(GroupMenu, "_check_group_selected", return_value="Group1"),
         patch("tkinter.colorchooser.askcolor", return_value=((0, 255, 0), "#00ff00")),
-        patch.object(GroupMenu, "build_menu"),
+        patch.object(GroupMenu, "create_color_box", return_value=MagicMock()) as mock_create,
     ):
         group_menu.set_group_color()
 
         # Verify color was updated
         assert group_menu.app.colors["Group1"] == "#00ff00"
 
-        # Verify menu was rebuilt
-        assert group_menu.build_menu.called
+        # Verify only the group's swatch was updated
+        group_menu.build_menu.assert_not_called()
+        group_menu.menu.entryconfigure.assert_called_once_with(4, image=mock_create.return_value)
 
 
 def test_set_group_color_cancelled(group_menu: GroupMenu) -> None:
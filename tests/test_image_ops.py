@@ -52,7 +52,8 @@ def test_merge_slices(test_zip: Path) -> None:
     """Test slice merging."""
     merged = merge_slices(str(test_zip))
 
-    # Check merged image dimensions
+    # Check merged image is grayscale, one byte per pixel, with the right dimensions
+    assert merged.mode == "L"
     assert merged.width == 100
     assert merged.height == 100
 
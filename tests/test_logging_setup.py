@@ -0,0 +1,222 @@
+"""Test suite for logging configuration."""
+
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from logging.handlers import QueueHandler
+from pathlib import Path
+
+import pytest
+
+import app.logging_setup
+from app.logging_setup import setup_logging
+
+# Module-level switches of the logging package that setup_logging changes
+RECORD_FLAGS = ("logThreads", "logProcesses", "logMultiprocessing", "_srcfile")
+
+
+@pytest.fixture
+def root_handlers() -> Iterator[None]:
+    """Restore the root logger's handlers and level after a test reconfigures logging."""
+    root_logger = logging.getLogger()
+    handlers = root_logger.handlers[:]
+    level = root_logger.level
+    record_flags = {name: getattr(logging, name) for name in RECORD_FLAGS}
+    yield
+    app.logging_setup._stop_listener()  # noqa: SLF001
+    root_logger.handlers[:] = handlers
+    root_logger.setLevel(level)
+    for name, value in record_flags.items():
+        setattr(logging, name, value)
+
+
+def test_setup_logging_writes_through_queue(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    root_handlers: None,
+) -> None:
+    """Test that records go through a queue and reach the log file once the listener stops.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Pytest temporary directory.
+    monkeypatch : pytest.MonkeyPatch
+        Pytest fixture for changing the working directory.
+    root_handlers : None
+        Fixture restoring the root logger afterwards.
+
+    """
+    monkeypatch.chdir(tmp_path)
+    log_file = tmp_path / "test.log"
+    setup_logging(log_file=log_file)
+    setup_logging(log_file=log_file)  # Reconfiguring replaces the queue rather than adding a second one
+
+    root_logger = logging.getLogger()
+    assert len(root_logger.handlers) == 1
+    assert isinstance(root_logger.handlers[0], QueueHandler)
+
+    logging.getLogger("test").info("queued message")
+    app.logging_setup._stop_listener()  # noqa: SLF001
+
+    lines = log_file.read_text().splitlines()
+    assert sum("Logging initialized" in line for line in lines) == 2
+    assert not any(getattr(logging, name) for name in RECORD_FLAGS)
+    assert lines[-1].endswith("test - INFO - queued message")
+
+
+def test_log_file_written_in_batches(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, root_handlers: None) -> None:
+    """Test that routine records are buffered while errors are written at once.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Pytest temporary directory.
+    monkeypatch : pytest.MonkeyPatch
+        Pytest fixture for changing the working directory and flush interval.
+    root_handlers : None
+        Fixture restoring the root logger afterwards.
+
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app.logging_setup, "LOG_FLUSH_INTERVAL_S", 3600.0)
+    log_file = tmp_path / "test.log"
+    setup_logging(log_file=log_file)
+
+    logger = logging.getLogger("test")
+    logger.info("buffered message")
+    logger.error("error message")
+
+    # Wait for the listener thread to reach the error, which writes out everything buffered before it
+    deadline = time.monotonic() + 5
+    while "error message" not in log_file.read_text() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    text = log_file.read_text()
+    assert text.index("buffered message") < text.index("error message")
+
+    logger.info("trailing message")
+    time.sleep(0.05)
+    assert "trailing message" not in log_file.read_text()
+    app.logging_setup._stop_listener()  # noqa: SLF001
+    assert "trailing message" in log_file.read_text()
+
+
+def wait_for_text(path: Path, text: str) -> bool:
+    """Wait up to five seconds for text to appear in a file, returning whether it did."""
+    deadline = time.monotonic() + 5
+    while text not in path.read_text():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_idle_listener_flushes_buffer(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, root_handlers: None) -> None:
+    """Test that a buffered record is written after the flush interval even when no further records arrive.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Pytest temporary directory.
+    monkeypatch : pytest.MonkeyPatch
+        Pytest fixture for changing the working directory and flush interval.
+    root_handlers : None
+        Fixture restoring the root logger afterwards.
+
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app.logging_setup, "LOG_FLUSH_INTERVAL_S", 0.05)
+    log_file = tmp_path / "test.log"
+    setup_logging(log_file=log_file)
+
+    logging.getLogger("test").info("idle message")
+    assert wait_for_text(log_file, "idle message")
+
+
+def log_in_worker(index: int) -> None:
+    """Log a message from a worker process."""
+    logging.getLogger("test").info("worker %d", index)
+
+
+@pytest.mark.skipif(not hasattr(os, "register_at_fork"), reason="requires fork")
+def test_forked_workers_log_after_parent(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    root_handlers: None,
+) -> None:
+    """Test that records logged before forking workers come before the workers' records in the log file.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Pytest temporary directory.
+    monkeypatch : pytest.MonkeyPatch
+        Pytest fixture for changing the working directory and flush interval.
+    root_handlers : None
+        Fixture restoring the root logger afterwards.
+
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app.logging_setup, "LOG_FLUSH_INTERVAL_S", 3600.0)
+    log_file = tmp_path / "test.log"
+    setup_logging(log_file=log_file)
+
+    logging.getLogger("test").info("before fork")
+    with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("fork")) as executor:
+        list(executor.map(log_in_worker, range(4)))
+    logging.getLogger("test").info("after workers")
+    app.logging_setup._stop_listener()  # noqa: SLF001
+
+    lines = log_file.read_text().splitlines()
+    messages = [line.rsplit(" - ", 1)[-1] for line in lines]
+    assert messages[0].startswith("Logging initialized")
+    assert messages[1] == "before fork"
+    assert sorted(messages[2:6]) == [f"worker {i}" for i in range(4)]
+    assert messages[6:] == ["after workers"]
+
+
+# Script that sets up logging, then forks a child that logs and exits normally, running its exit handlers
+FORK_EXIT_SCRIPT = """
+import logging, os, sys
+from app.logging_setup import setup_logging
+setup_logging(log_file="test.log")
+pid = os.fork()
+if pid == 0:
+    logging.getLogger("test").info("child")
+    sys.exit(0)
+_, status = os.waitpid(pid, 0)
+logging.getLogger("test").info("parent")
+sys.exit(os.waitstatus_to_exitcode(status))
+"""
+
+
+@pytest.mark.skipif(not hasattr(os, "register_at_fork"), reason="requires fork")
+def test_forked_child_exits_cleanly(tmp_path: Path) -> None:
+    """Test that a forked child exiting normally does not try to stop the listener it inherited.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Pytest temporary directory.
+
+    """
+    env = {**os.environ, "PYTHONPATH": str(Path(__file__).resolve().parents[1])}
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", FORK_EXIT_SCRIPT],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=30,
+        check=False,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "Traceback" not in result.stderr
+    messages = [line.rsplit(" - ", 1)[-1] for line in (tmp_path / "test.log").read_text().splitlines()]
+    assert messages[1:] == ["child", "parent"]
@@ -16,6 +16,7 @@ def mock_tk():
     mock_parent.winfo_screenwidth.return_value = 1920
     mock_parent.winfo_screenheight.return_value = 1080
     mock_parent.update = MagicMock()
+    mock_parent.update_idletasks = MagicMock()
 
     # Create mock toplevel
     mock_toplevel = MagicMock(spec=tk.Toplevel)
@@ -54,8 +55,9 @@ def test_popup_initialization(mock_tk: dict):
     # Check that grab_set was called
     mock_tk["toplevel"].grab_set.assert_called_once()
 
-    # Check that parent update was called
-    mock_tk["parent"].update.assert_called_once()
+    # Check that the popup was drawn without processing other events
+    mock_tk["parent"].update_idletasks.assert_called_once()
+    mock_tk["parent"].update.assert_not_called()
 
     # Check that Label was created with message
     tk.Label.assert_called_once()
@@ -0,0 +1,262 @@
+"""Test suite for print file loading and saving utilities."""
+
+import io
+import json
+import zipfile
+from pathlib import Path
+
+import pytest
+from PIL import Image, ImageChops
+
+import app.print_file_utils
+from app.print_file_utils import load_print_file, open_print_file, save_print_file
+
+
+@pytest.fixture
+def print_file(tmp_path: Path) -> Path:
+    """Create a print file with two layers sharing one image.
+
+    Returns
+    -------
+    Path
+        Path to the print file zip.
+
+    """
+    settings = {
+        "Layers": [
+            {"Image settings list": [{"Image file": "a.png"}, {"Image file": "b.png"}]},
+            {"Image settings list": [{"Image file": "a.png"}]},
+        ],
+    }
+    path = tmp_path / "print.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("print_settings.json", json.dumps(settings))
+        for name, box in (("a.png", (0, 0, 10, 10)), ("b.png", (20, 20, 30, 30))):
+            img = Image.new("L", (64, 48), color=0)
+            img.paste(255, box)
+            buf = io.BytesIO()
+            img.save(buf, format="PNG")
+            zf.writestr(f"slices/{name}", buf.getvalue())
+    return path
+
+
+def test_open_print_file_matches_load(print_file: Path) -> None:
+    """Test that lazily opened images match eagerly loaded ones.
+
+    Parameters
+    ----------
+    print_file : Path
+        Fixture providing a print file.
+
+    """
+    settings, images = load_print_file(print_file)
+    lazy_settings, lazy_images = open_print_file(print_file)
+    with lazy_images:
+        assert lazy_settings == settings
+        assert set(lazy_images) == set(images)
+        for name, img in images.items():
+            assert ImageChops.difference(lazy_images[name], img).getbbox() is None
+
+
+def test_lazy_store_assignment_and_copy(print_file: Path) -> None:
+    """Test that assigned images are kept and that copies are independent.
+
+    Parameters
+    ----------
+    print_file : Path
+        Fixture providing a print file.
+
+    """
+    _, images = open_print_file(print_file)
+    with images:
+        copied = images.copy()
+        new_img = Image.new("L", (64, 48), color=255)
+        copied["new.png"] = new_img
+
+        assert copied["new.png"] is new_img
+        assert "new.png" in copied
+        assert "new.png" not in images
+        assert len(copied) == len(images) + 1
+        with pytest.raises(KeyError):
+            images["new.png"]
+
+
+def test_open_print_file_missing_image(tmp_path: Path) -> None:
+    """Test that a print file referencing a missing image fails when opened.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Pytest temporary directory.
+
+    """
+    path = tmp_path / "print.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("print_settings.json", json.dumps({"Layers": [{"Image settings list": [{"Image file": "x.png"}]}]}))
+
+    with pytest.raises(KeyError, match=r"x\.png"):
+        open_print_file(path)
+
+
+def test_save_print_file_compress_level(tmp_path: Path, print_file: Path) -> None:
+    """Test that images saved at any compression level load back unchanged.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Pytest temporary directory.
+    print_file : Path
+        Fixture providing a print file.
+
+    """
+    settings, images = load_print_file(print_file)
+    for level in (1, 9):
+        output_path = tmp_path / f"level_{level}.zip"
+        save_print_file(output_path, settings, images, compress_level=level)
+
+        saved_settings, saved_images = load_print_file(output_path)
+        assert saved_settings == settings
+        for name, img in images.items():
+            assert ImageChops.difference(saved_images[name], img).getbbox() is None
+
+
+def test_save_print_file_from_generator(tmp_path: Path, print_file: Path) -> None:
+    """Test that images can be streamed to the print file as (filename, image) pairs.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Pytest temporary directory.
+    print_file : Path
+        Fixture providing a print file.
+
+    """
+    settings, images = load_print_file(print_file)
+    output_path = tmp_path / "streamed.zip"
+    save_print_file(output_path, settings, ((name, img) for name, img in images.items()))
+
+    saved_settings, saved_images = load_print_file(output_path)
+    assert saved_settings == settings
+    assert set(saved_images) == set(images)
+    for name, img in images.items():
+        assert ImageChops.difference(saved_images[name], img).getbbox() is None
+
+
+def test_print_settings_without_orjson(tmp_path: Path, print_file: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that print settings round-trip the same with and without orjson installed.
+
+    The settings include values orjson cannot read or would write differently from the standard library.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Pytest temporary directory.
+    print_file : Path
+        Fixture providing a print file.
+    monkeypatch : pytest.MonkeyPatch
+        Pytest fixture for patching the JSON backend.
+
+    """
+    settings, images = load_print_file(print_file)
+    for notes in ({"name": "Bauteil µ-Kanal", "offset": float("inf")}, {"serial": 2**70 + 1}):
+        settings["Notes"] = notes
+        save_print_file(tmp_path / "default.zip", settings, images)
+        with monkeypatch.context() as patched:
+            patched.setattr(app.print_file_utils, "orjson", None)
+            save_print_file(tmp_path / "stdlib.zip", settings, images)
+            saved_without_orjson, _ = load_print_file(tmp_path / "default.zip")
+        saved_with_orjson, _ = load_print_file(tmp_path / "default.zip")
+
+        with zipfile.ZipFile(tmp_path / "default.zip") as default, zipfile.ZipFile(tmp_path / "stdlib.zip") as stdlib:
+            assert default.read("print_settings.json") == stdlib.read("print_settings.json")
+        assert saved_without_orjson == settings
+        assert saved_with_orjson == settings
+        assert type(saved_with_orjson["Notes"].get("serial", 0)) is int
+
+
+def test_save_print_file_threaded_encoding(
+    tmp_path: Path,
+    print_file: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that encoding on several threads writes the same images, in the same order, as encoding serially.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Pytest temporary directory.
+    print_file : Path
+        Fixture providing a print file.
+    monkeypatch : pytest.MonkeyPatch
+        Pytest fixture for faking the CPU count.
+
+    """
+    settings, images = load_print_file(print_file)
+    images = {f"{i}_{name}": img for i in range(5) for name, img in images.items()}
+    save_print_file(tmp_path / "serial.zip", settings, images)
+
+    monkeypatch.setattr(app.print_file_utils.os, "cpu_count", lambda: 2)
+    save_print_file(tmp_path / "threaded.zip", settings, images)
+
+    with zipfile.ZipFile(tmp_path / "serial.zip") as serial, zipfile.ZipFile(tmp_path / "threaded.zip") as threaded:
+        assert threaded.namelist() == serial.namelist()
+        for name in serial.namelist():
+            assert threaded.read(name) == serial.read(name)
+
+
+def test_save_print_file_stores_images_uncompressed(tmp_path: Path, print_file: Path) -> None:
+    """Test that images are stored as is while the settings are compressed.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Pytest temporary directory.
+    print_file : Path
+        Fixture providing a print file.
+
+    """
+    settings, images = load_print_file(print_file)
+    output_path = tmp_path / "output.zip"
+    save_print_file(output_path, settings, images)
+
+    with zipfile.ZipFile(output_path) as zf:
+        assert zf.getinfo("print_settings.json").compress_type == zipfile.ZIP_DEFLATED
+        for name in images:
+            assert zf.getinfo(f"slices/{name}").compress_type == zipfile.ZIP_STORED
+
+
+def test_save_print_file_copies_unchanged_images(tmp_path: Path, print_file: Path) -> None:
+    """Test that grayscale images unchanged since opening are copied as is and all others are encoded.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Pytest temporary directory.
+    print_file : Path
+        Fixture providing a print file.
+
+    """
+    # Store b.png as RGB, which must be converted to grayscale rather than copied
+    rgb_path = tmp_path / "rgb.zip"
+    with zipfile.ZipFile(print_file) as src, zipfile.ZipFile(rgb_path, "w") as dst:
+        for name in src.namelist():
+            data = src.read(name)
+            if name == "slices/b.png":
+                buf = io.BytesIO()
+                Image.open(io.BytesIO(data)).convert("RGB").save(buf, format="PNG")
+                data = buf.getvalue()
+            dst.writestr(name, data)
+
+    output_path = tmp_path / "output.zip"
+    settings, images = open_print_file(rgb_path)
+    with images:
+        images["new.png"] = Image.new("L", (64, 48), color=128)
+        save_print_file(output_path, settings, images, compress_level=1)
+
+    with zipfile.ZipFile(rgb_path) as src, zipfile.ZipFile(output_path) as out:
+        assert out.read("slices/a.png") == src.read("slices/a.png")
+        assert out.read("slices/b.png") != src.read("slices/b.png")
+        slices = {name for name in out.namelist() if name.startswith("slices/") and name != "slices/"}
+        assert slices == {"slices/a.png", "slices/b.png", "slices/new.png"}
+        for name in ("b.png", "new.png"):
+            assert Image.open(io.BytesIO(out.read(f"slices/{name}"))).mode == "L"
@@ -0,0 +1,65 @@
+"""Test suite for the selection module."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.selection import Selection
+
+
+def test_append_keeps_order_and_ignores_duplicates() -> None:
+    """Test that components are kept in selection order without duplicates."""
+    selection = Selection()
+    comp1, comp2 = MagicMock(), MagicMock()
+    selection.append(comp1)
+    selection.append(comp2)
+    selection.append(comp1)
+
+    assert len(selection) == 2
+    assert list(selection) == [comp1, comp2]
+    assert selection == [comp1, comp2]
+    assert selection[0] is comp1
+    assert selection[-1] is comp2
+    assert comp1 in selection
+
+
+def test_remove() -> None:
+    """Test removing selected and unselected components."""
+    selection = Selection()
+    comp = MagicMock()
+    selection.append(comp)
+    selection.remove(comp)
+
+    assert comp not in selection
+    assert selection == []
+    with pytest.raises(ValueError, match="not selected"):
+        selection.remove(comp)
+
+
+def test_discard() -> None:
+    """Test that discarding removes a selected component and ignores an unselected one."""
+    selection = Selection()
+    comp1, comp2 = MagicMock(), MagicMock()
+    selection.append(comp1)
+    selection.discard(comp1)
+    selection.discard(comp2)
+
+    assert selection == []
+
+
+def test_empty_selection() -> None:
+    """Test that an empty selection is falsy and raises on indexing."""
+    selection = Selection()
+    assert not selection
+    with pytest.raises(IndexError):
+        selection[0]
+
+
+def test_clear() -> None:
+    """Test clearing the selection."""
+    selection = Selection()
+    selection.append(MagicMock())
+    selection.append(MagicMock())
+    selection.clear()
+
+    assert len(selection) == 0
@@ -0,0 +1,112 @@
+"""Test suite for the spatial index module."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.spatial_index import SpatialIndex
+
+
+def make_comp(x: int, y: int) -> MagicMock:
+    """Create a stand-in component at the given position."""
+    comp = MagicMock()
+    comp.x = x
+    comp.y = y
+    return comp
+
+
+@pytest.fixture
+def index() -> SpatialIndex:
+    """Create a small-celled index for testing."""
+    return SpatialIndex(cell_size=10)
+
+
+def test_insert_and_query(index: SpatialIndex) -> None:
+    """Test that a query returns only components whose origin is inside the area."""
+    inside = make_comp(5, 5)
+    edge = make_comp(20, 20)
+    outside = make_comp(21, 5)
+    for comp in (inside, edge, outside):
+        index.insert(comp)
+
+    assert len(index) == 3
+    assert set(index.query(0, 0, 20, 20)) == {inside, edge}
+
+
+def test_query_empty_area(index: SpatialIndex) -> None:
+    """Test that an inverted area yields nothing."""
+    index.insert(make_comp(5, 5))
+    assert list(index.query(10, 10, 0, 0)) == []
+
+
+def test_query_negative_coordinates(index: SpatialIndex) -> None:
+    """Test components left of or above the origin are found."""
+    comp = make_comp(-15, -3)
+    index.insert(comp)
+    assert list(index.query(-20, -20, 0, 0)) == [comp]
+
+
+def test_move(index: SpatialIndex) -> None:
+    """Test that moved components are found at their new position only."""
+    comp = make_comp(5, 5)
+    index.insert(comp)
+    comp.x, comp.y = 105, 105
+    index.move(comp)
+
+    assert list(index.query(0, 0, 50, 50)) == []
+    assert list(index.query(100, 100, 110, 110)) == [comp]
+
+
+def test_remove(index: SpatialIndex) -> None:
+    """Test removing components, including ones that were never added."""
+    comp = make_comp(5, 5)
+    index.insert(comp)
+    index.remove(comp)
+    index.remove(make_comp(0, 0))
+
+    assert len(index) == 0
+    assert list(index.query(0, 0, 50, 50)) == []
+
+
+def test_clear(index: SpatialIndex) -> None:
+    """Test clearing the index."""
+    index.insert(make_comp(5, 5))
+    index.insert(make_comp(50, 50))
+    index.clear()
+
+    assert len(index) == 0
+    assert list(index) == []
+
+
+def test_remove_keeps_remaining_queryable(index: SpatialIndex) -> None:
+    """Test that removing a component from the middle leaves the others intact."""
+    comps = [make_comp(5 * i, 5 * i) for i in range(5)]
+    for comp in comps:
+        index.insert(comp)
+    index.remove(comps[1])
+    comps[4].x = 1
+    index.move(comps[4])
+
+    assert len(index) == 4
+    assert set(index) == {comps[0], comps[2], comps[3], comps[4]}
+    assert set(index.query(0, 0, 15, 20)) == {comps[0], comps[2], comps[3], comps[4]}
+
+
+def test_grows_beyond_initial_capacity(index: SpatialIndex) -> None:
+    """Test that the index holds more components than its initial allocation."""
+    comps = [make_comp(i, i) for i in range(200)]
+    for comp in comps:
+        index.insert(comp)
+
+    assert len(index) == 200
+    assert set(index.query(0, 0, 199, 199)) == set(comps)
+
+
+def test_query_spanning_many_cells(index: SpatialIndex) -> None:
+    """Test a query whose interior cells are accepted wholesale and whose border cells are tested."""
+    comps = {(x, y): make_comp(x, y) for x in range(0, 100, 5) for y in range(0, 100, 5)}
+    for comp in comps.values():
+        index.insert(comp)
+
+    expected = {comp for (x, y), comp in comps.items() if 12 <= x <= 67 and 3 <= y <= 81}
+    assert set(index.query(12, 3, 67, 81)) == expected